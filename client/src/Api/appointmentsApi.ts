@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { fetchAllPages } from './pagination';
 
 const API_URL = 'https://digital-vet-backend.onrender.com/api/appointments/';
 
@@ -11,8 +12,7 @@ export interface Appointment {
 }
 
 export const getAppointments = async (): Promise<Appointment[]> => {
-    const response = await axios.get(API_URL);
-    return response.data;
+    return fetchAllPages<Appointment>(API_URL);
 };
 
 export const getAppointment = async (id: number): Promise<Appointment> => {
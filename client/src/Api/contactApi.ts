@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { fetchAllPages } from './pagination';
 
 const API_URL = 'https://digital-vet-backend.onrender.com/api/contacts/';
 
@@ -10,8 +11,7 @@ export interface Contact {
 }
 
 export const getContacts = async (): Promise<Contact[]> => {
-    const response = await axios.get(API_URL);
-    return response.data;
+    return fetchAllPages<Contact>(API_URL);
 };
 
 export const getContact = async (id: number): Promise<Contact> => {
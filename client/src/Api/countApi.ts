@@ -70,4 +70,34 @@ export const getUserCount = async (): Promise<number> => {
     console.error("Error fetching user count:", error);
     return 0;
   }
-};
\ No newline at end of file
+};
+export interface DashboardSummary {
+  total_sales: number;
+  total_medicines: number;
+  total_appointments: number;
+  total_contacts: number;
+  total_patients: number;
+  total_users: number;
+  total_revenue: number;
+}
+
+export const getDashboardSummary = async (): Promise<DashboardSummary | null> => {
+  try {
+    const response = await axios.get<DashboardSummary>(`${BASE_URL}/dashboard/summary/`);
+    return response.data;
+  } catch (error) {
+    console.error("Error fetching dashboard summary:", error);
+    return null;
+  }
+};
+
+export const DASHBOARD_EVENTS = ["sale.created", "medicine.low_stock", "appointment.created", "appointment.updated", "patient.created", "patient.updated"];
+
+// Calls onEvent for every live dashboard event; returns a function that closes the stream.
+export const subscribeToDashboardEvents = (onEvent: (type: string, data: unknown) => void): (() => void) => {
+  const source = new EventSource(`${BASE_URL}/events/`);
+  DASHBOARD_EVENTS.forEach((type) =>
+    source.addEventListener(type, (event) => onEvent(type, JSON.parse((event as MessageEvent).data)))
+  );
+  return () => source.close();
+};
@@ -1,5 +1,6 @@
 
 import axios from "axios";
+import { fetchAllPages } from "./pagination";
 
 const BASE_URL = "https://digital-vet-backend.onrender.com/api/medicine/";
 
@@ -15,8 +16,7 @@ export interface Medicine {
 // Fetch all medicines
 export const getMedicines = async (): Promise<Medicine[]> => {
   try {
-    const response = await axios.get<Medicine[]>(BASE_URL);
-    return response.data;
+    return await fetchAllPages<Medicine>(BASE_URL);
   } catch (error) {
     console.error("Error fetching medicines:", error);
     throw error;
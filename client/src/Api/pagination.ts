@@ -0,0 +1,20 @@
+import axios from "axios";
+
+// Shape of a cursor-paginated list response from the API
+export interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+// Follow the opaque `next` cursors until every page of a list endpoint is loaded
+export const fetchAllPages = async <T>(url: string): Promise<T[]> => {
+  const items: T[] = [];
+  let nextUrl: string | null = url;
+  while (nextUrl) {
+    const response: { data: CursorPage<T> } = await axios.get<CursorPage<T>>(nextUrl);
+    items.push(...response.data.results);
+    nextUrl = response.data.next;
+  }
+  return items;
+};
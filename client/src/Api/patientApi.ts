@@ -1,4 +1,5 @@
 import axios from "axios";
+import { fetchAllPages } from "./pagination";
 
 // Define the API base URL
 const API_BASE_URL = "https://digital-vet-backend.onrender.com/api/patients";
@@ -22,8 +23,7 @@ const api = axios.create({
 
 // Fetch all animals
 export const getAnimals = async (): Promise<Animal[]> => {
-  const response = await api.get("/");
-  return response.data;
+  return fetchAllPages<Animal>(`${API_BASE_URL}/`);
 };
 
 // Fetch a single animal by ID
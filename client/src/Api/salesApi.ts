@@ -1,4 +1,5 @@
 import axios from "axios";
+import { fetchAllPages } from "./pagination";
 import { getMedicines } from "./medsalesApi";
 
 const BASE_URL = "https://digital-vet-backend.onrender.com/api/sales/";
@@ -15,8 +16,7 @@ export interface Sale {
 // Fetch all sales
 export const getSales = async (): Promise<Sale[]> => {
   try {
-    const response = await axios.get<Sale[]>(BASE_URL);
-    return response.data;
+    return await fetchAllPages<Sale>(BASE_URL);
   } catch (error) {
     console.error("Error fetching sales:", error);
     throw error;
@@ -61,6 +61,22 @@ export const createSale = async (sale: Sale) => {
   };
   
 
+export interface CheckoutItem {
+  medicine: number;
+  quantity_sold: number;
+}
+
+// Sell several medicines in one request; the server rejects the whole cart if any line is short
+export const checkoutSales = async (items: CheckoutItem[]): Promise<Sale[]> => {
+  try {
+    const response = await axios.post<Sale[]>(`${BASE_URL}checkout/`, { items });
+    return response.data;
+  } catch (error) {
+    console.error("Error checking out sales:", error);
+    throw error;
+  }
+};
+
 // Update an existing sale
 export const updateSale = async (id: number, sale: Sale): Promise<Sale> => {
   try {
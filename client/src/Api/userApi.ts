@@ -11,12 +11,18 @@ const Base_URL = 'https://digital-vet-backend.onrender.com/api/register/'
 // Function to fetch all users
 export const fetchUsers = async (): Promise<User[]> => {
     try {
-        const response = await fetch(BASE_URL);
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
+        const users: User[] = [];
+        let nextUrl: string | null = `${BASE_URL}/`;
+        while (nextUrl) {
+            const response: Response = await fetch(nextUrl);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            const page: { next: string | null; results: User[] } = await response.json();
+            users.push(...page.results);
+            nextUrl = page.next;
         }
-        const data: User[] = await response.json();
-        return data;
+        return users;
     } catch (error) {
         console.error('Error fetching users:', error);
         throw error;
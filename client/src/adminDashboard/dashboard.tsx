@@ -6,7 +6,7 @@ import MedicationsManagement from './medications';
 import SupportTickets from './support';
 import AppointmentsManagement from './appointments';
 import PatientsManagement from './patients';
-import { getTotalMedicines, getTotalAppointments, getTotalRevenue, getTotalPatients, getUserCount,getTotalContacts  } from '../Api/countApi';
+import { getDashboardSummary, subscribeToDashboardEvents } from '../Api/countApi';
 import { LineChart, Line, BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 
 interface AdminDashboardProps {
@@ -178,22 +178,19 @@ function Overview() {
 
   useEffect(() => {
     const fetchData = async () => {
-      const patients = await getTotalPatients();
-      const appointments = await getTotalAppointments();
-      const revenue = await getTotalRevenue();
-      const supportTickets = await getTotalContacts(); // Fetch support tickets
-      const medicines = await getTotalMedicines();
-      const users = await getUserCount();
+      const summary = await getDashboardSummary(); // All totals in one request
+      if (!summary) return;
 
-      setTotalPatients(patients);
-      setTotalAppointments(appointments);
-      setTotalRevenue(revenue);
-      setTotalSupportTickets(supportTickets);
-      setTotalMedicines(medicines);
-      setTotalUsers(users);
+      setTotalPatients(summary.total_patients);
+      setTotalAppointments(summary.total_appointments);
+      setTotalRevenue(summary.total_revenue);
+      setTotalSupportTickets(summary.total_contacts); // Support tickets
+      setTotalMedicines(summary.total_medicines);
+      setTotalUsers(summary.total_users);
     };
 
     fetchData();
+    return subscribeToDashboardEvents(() => fetchData()); // Refresh the totals as sales and bookings come in
   }, []);
 
     //start cards
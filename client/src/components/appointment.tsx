@@ -82,6 +82,7 @@ export function AppointmentModal({ isOpen, onClose }: AppointmentModalProps) {
             <input
               type="time"
               name="time"
+              step={1800} // Bookable slots are 30 minutes apart
               value={formData.time}
               onChange={handleInputChange}
               className="w-full p-2 border rounded-md focus:ring focus:ring-blue-200"
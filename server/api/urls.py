@@ -18,7 +18,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from veterinary.views import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("veterinary.urls")),
+    path("metrics", metrics, name="metrics"),
 ]
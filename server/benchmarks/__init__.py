@@ -0,0 +1,189 @@
+"""
+Benchmarks for the clinic API.
+
+Each module runs on its own from the server directory, e.g.
+`python -m benchmarks.auth`, against a throwaway copy of the database, and
+prints its results as JSON.
+"""
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+# How each server kind is started; {port} is filled in
+SERVERS = {
+    'asgi': [sys.executable, '-m', 'uvicorn', 'api.asgi:application', '--port', '{port}', '--log-level', 'warning'],
+    'wsgi': [sys.executable, '-m', 'gunicorn', 'api.wsgi:application', '--bind', '127.0.0.1:{port}', '--log-level', 'warning'],
+}
+
+
+def setup(database=None):
+    """Configure Django; with `database`, against that SQLite file through benchmarks.settings."""
+    if database is not None:
+        os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+        os.environ['BENCHMARK_DATABASE'] = str(database)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def scratch_database():
+    """Create the test database for the duration of a run and drop it afterwards."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def percentiles(samples):
+    """p50/p95/p99 and mean of a list of durations in seconds, reported in milliseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    cuts = statistics.quantiles(ordered, n=100, method='inclusive') if len(ordered) > 1 else ordered * 99
+    return {
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+    }
+
+
+def timed(fn, iterations):
+    """Call fn() `iterations` times and return the per-call durations."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(name, results, stream=sys.stdout):
+    json.dump({'benchmark': name, 'results': results}, stream, indent=2, default=str)
+    stream.write('\n')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(kind, database, response_cache=False, extra_args=(), env=None):
+    """
+    Run the app in a server subprocess against `database` and yield its base URL.
+
+    `kind` is a key of SERVERS. The server uses benchmarks.settings, so the
+    response cache is off unless asked for.
+    """
+    port = free_port()
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+        'BENCHMARK_DATABASE': str(database),
+        'BENCHMARK_RESPONSE_CACHE': '1' if response_cache else '0',
+        **(env or {}),
+    }
+    command = [part.format(port=port) for part in SERVERS[kind]] + list(extra_args)
+    process = subprocess.Popen(command, cwd=SERVER_DIR, env=env)
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f'{kind} server did not start')
+                time.sleep(0.1)
+        yield f'127.0.0.1:{port}'
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+request_headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+
+
+def request_spec(entry):
+    if isinstance(entry, str):
+        return 'GET', entry, None
+    method, path, body = entry
+    return method, path, None if body is None else json.dumps(body)
+
+
+def load(host, paths, concurrency=8, duration=10.0, headers=None):
+    """
+    Request `paths` round-robin from `concurrency` keep-alive clients for `duration` seconds.
+
+    Each entry is a path to GET or a (method, path, json_body) tuple.
+    Returns throughput, error count and latency percentiles; responses of
+    400 and above count as errors. A response's Server-Timing header, when
+    present, supplies its query count.
+    """
+    latencies, queries, errors = [], [], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        connection = http.client.HTTPConnection(host, timeout=60)
+        n = offset
+        while time.monotonic() < deadline:
+            method, path, body = request_spec(paths[n % len(paths)])
+            n += 1
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers={**request_headers, **(headers or {})})
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                with lock:
+                    errors[0] += 1
+                connection.close()
+                connection = http.client.HTTPConnection(host, timeout=60)
+                continue
+            elapsed = time.perf_counter() - start
+            timing = response.getheader('Server-Timing') or ''
+            with lock:
+                if response.status >= 400:
+                    errors[0] += 1
+                latencies.append(elapsed)
+                if 'queries' in timing:
+                    queries.append(int(timing.rsplit('desc="', 1)[1].split()[0]))
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'requests_per_second': round(len(latencies) / elapsed, 2),
+        'queries_per_request': round(statistics.fmean(queries), 2) if queries else None,
+        **percentiles(latencies),
+    }
@@ -0,0 +1,74 @@
+"""
+Read throughput and latency of the async read paths under uvicorn (ASGI)
+against the same app under gunicorn's sync worker (WSGI), one process each.
+
+    python -m benchmarks.asgi_vs_wsgi [--concurrency C] [--duration S]
+"""
+import argparse
+import random
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from . import load, report, scratch_database, serve, setup
+
+READ_PATHS = [
+    '/api/medicine/',
+    '/api/patients/',
+    '/api/sales/',
+    '/api/appointments/',
+    '/api/medicine/count/',
+    '/api/sales/total-revenue/',
+]
+
+
+def seed(rows):
+    from veterinary.models import Animal, Appointment, Medicine, Sale
+
+    rng = random.Random(17)
+    medicines = Medicine.objects.bulk_create(
+        Medicine(
+            name=f'Medicine {i}', category='general', quantity=rng.randint(0, 500),
+            price=Decimal(rng.randint(100, 5000)) / 100, expiry_date=date(2030, 1, 1),
+        )
+        for i in range(rows)
+    )
+    Animal.objects.bulk_create(
+        Animal(owner_name=f'Owner {i}', owner_contact='0700000000', species=rng.choice(['Dog', 'Cat', 'Cow']))
+        for i in range(rows)
+    )
+    Appointment.objects.bulk_create(
+        Appointment(
+            owner_name=f'Owner {i}', owner_contact='0700000000',
+            date=date(2030, 1, 1) + timedelta(days=i // 18), time=time(8 + (i % 18) // 2, 30 * (i % 2)),
+        )
+        for i in range(rows)
+    )
+    Sale.objects.bulk_create(
+        Sale(medicine=medicine, quantity_sold=1, total_price=medicine.price)
+        for medicine in (rng.choice(medicines) for _ in range(rows * 4))
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    setup()
+    from django.db import connection
+
+    with scratch_database():
+        seed(args.rows)
+        database = connection.settings_dict['NAME']
+        results = {'rows': args.rows, 'concurrency': args.concurrency, 'paths': READ_PATHS}
+        for kind in ('wsgi', 'asgi'):
+            with serve(kind, database) as host:
+                load(host, READ_PATHS, concurrency=2, duration=1)  # warm up
+                results[kind] = load(host, READ_PATHS, args.concurrency, args.duration)
+        report('asgi_vs_wsgi', results)
+
+
+if __name__ == '__main__':
+    main()
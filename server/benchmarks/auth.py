@@ -0,0 +1,58 @@
+"""
+Token authentication: queries and time per authenticated request, with and
+without the token cache.
+
+    python -m benchmarks.auth [--requests N]
+"""
+import argparse
+
+from . import percentiles, report, scratch_database, setup, timed
+
+
+def run(requests):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.authentication import TokenAuthentication
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient, APIRequestFactory
+
+    from veterinary.authentication import CachedTokenAuthentication, token_cache
+    from veterinary.models import CustomUser
+
+    user = CustomUser.objects.create_user(email='bench@example.com', password='bench', full_name='Bench')
+    token = Token.objects.create(user=user)
+    request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Token {token.key}')
+    token_cache().clear()
+
+    results = {}
+    for authentication in (TokenAuthentication(), CachedTokenAuthentication()):
+        with CaptureQueriesContext(connection) as queries:
+            samples = timed(lambda: authentication.authenticate(request), requests)
+        results[type(authentication).__name__] = {
+            'requests': requests,
+            'queries_per_request': len(queries) / requests,
+            **percentiles(samples),
+        }
+
+    # End to end through the configured authentication class
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    client.get('/api/dashboard/summary/')
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/api/dashboard/summary/')
+    results['dashboard_summary_queries'] = len(queries)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    setup()
+    with scratch_database():
+        report('auth', run(args.requests))
+
+
+if __name__ == '__main__':
+    main()
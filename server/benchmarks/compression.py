@@ -0,0 +1,65 @@
+"""
+Compression: CPU time per response against the bytes it saves, per encoding.
+
+    python -m benchmarks.compression [--rows N] [--repeat N]
+"""
+import argparse
+import csv
+import io
+
+from . import percentiles, report, setup, timed
+from .renderers import payloads
+
+
+def bodies(rows):
+    """A rendered JSON list and the same rows as CSV export lines."""
+    from veterinary.renderers import ORJSONRenderer
+
+    data = payloads(rows)
+    out = io.StringIO()
+    writer = csv.writer(out)
+    lines = []
+    for row in data['sales']:
+        writer.writerow(row.values())
+        lines.append(out.getvalue().encode())
+        out.seek(0)
+        out.truncate()
+    return {
+        'medicine_json': [ORJSONRenderer().render(data['medicine'])],
+        'sales_json': [ORJSONRenderer().render(data['sales'])],
+        # One chunk per row, as /api/sales/export/ streams it
+        'sales_csv_stream': lines,
+    }
+
+
+def run(rows, repeat):
+    from veterinary.compression import ENCODERS, compress_stream
+
+    results = {'encodings': sorted(ENCODERS)}
+    for name, chunks in bodies(rows).items():
+        size = sum(map(len, chunks))
+        results[name] = {'bytes': size, 'chunks': len(chunks)}
+        for encoding, encoder_class in ENCODERS.items():
+            compressed = b''.join(compress_stream(encoder_class(), chunks))
+            samples = timed(lambda: b''.join(compress_stream(encoder_class(), chunks)), repeat)
+            results[name][encoding] = {
+                'bytes': len(compressed),
+                'saved_pct': round(100 * (1 - len(compressed) / size), 1),
+                'mb_per_s': round(size / 1e6 / (sum(samples) / len(samples)), 1),
+                **percentiles(samples),
+            }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    setup()
+    report('compression', run(args.rows, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Synthetic clinic data in bulk: users, contact messages, patients,
+diagnoses, appointments, medicines with their lots, and sales (a million at
+--scale 1).
+
+    python -m benchmarks.dataset --database bench.sqlite3 [--scale S] [--batch-size N]
+
+The database file is created and migrated first, and can then be handed
+to `python -m benchmarks.routes --database`. Rows are written with
+bulk_create in large batches; the dashboard counters, daily rollups and
+table versions are recomputed once at the end instead of per row.
+"""
+import argparse
+import itertools
+import random
+import time
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+
+from . import report, setup
+
+# Rows per model at --scale 1
+VOLUMES = {
+    'users': 200,
+    'contacts': 5000,
+    'medicines': 2000,
+    'patients': 50000,
+    'diagnoses': 150000,
+    'appointments': 100000,
+    'sales': 1000000,
+}
+
+SPECIES = ['Dog', 'Cat', 'Cow', 'Goat', 'Sheep', 'Horse', 'Rabbit', 'Chicken', 'Pig', 'Parrot']
+FIRST_NAMES = ['Amina', 'Brian', 'Wanjiru', 'Otieno', 'Grace', 'Kevin', 'Achieng', 'Peter', 'Faith', 'Juma']
+LAST_NAMES = ['Mwangi', 'Ochieng', 'Kamau', 'Njeri', 'Kiptoo', 'Wafula', 'Mutua', 'Atieno', 'Chebet', 'Odhiambo']
+DIAGNOSES = [
+    ('Ear infection', 'Amoxicillin'), ('Tick fever', 'Oxytetracycline'), ('Mastitis', 'Penicillin'),
+    ('Worm infestation', 'Albendazole'), ('Skin allergy', 'Prednisolone'), ('Foot rot', 'Sulfadimidine'),
+    ('Respiratory infection', 'Enrofloxacin'), ('Routine vaccination', 'Rabies vaccine'),
+]
+SLOT_TIMES = [dt_time(hour, minute) for hour in range(8, 17) for minute in (0, 30)]
+
+
+def batched(rows, size):
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def insert(model, rows, batch_size):
+    """bulk_create `rows` in batches of `batch_size`, one transaction each; returns how many were written."""
+    from django.db import transaction
+
+    written = 0
+    for batch in batched(rows, batch_size):
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        written += len(batch)
+    return written
+
+
+def owner(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}', f'07{rng.randint(0, 99999999):08d}'
+
+
+def generate(scale=1.0, batch_size=20000, seed=7):
+    """Fill the configured (empty) database and return {table: {'rows': n, 'seconds': s}}."""
+    from django.contrib.auth.hashers import make_password
+    from django.db import transaction
+    from django.db.models import Sum
+    from django.utils import timezone
+
+    from veterinary.models import (
+        Animal, AnimalDiagnosis, Appointment, Contact, CustomUser, DailySalesRollup, Medicine,
+        MedicineLot, Sale, TableVersion,
+    )
+    from veterinary.signals import VERSIONED_MODELS, rebuild_dashboard_counters
+
+    rng = random.Random(seed)
+    volumes = {name: max(1, int(count * scale)) for name, count in VOLUMES.items()}
+    today = timezone.localdate()
+    timings = {}
+
+    def timed_insert(name, model, rows):
+        start = time.perf_counter()
+        written = insert(model, rows, batch_size)
+        timings[name] = {'rows': written, 'seconds': round(time.perf_counter() - start, 2)}
+
+    # Hashing once keeps users cheap; every account's password is "benchmark"
+    password = make_password('benchmark')
+    timed_insert('users', CustomUser, (
+        CustomUser(username=f'user{n}@example.com', email=f'user{n}@example.com', full_name=owner(rng)[0],
+                   password=password)
+        for n in range(volumes['users'])
+    ))
+
+    timed_insert('contacts', Contact, (
+        Contact(subject=f'Question {n}', email=f'owner{n}@example.com', message=f'Is the clinic open on day {n % 7}?')
+        for n in range(volumes['contacts'])
+    ))
+
+    categories = [choice for choice, _ in Medicine.CATEGORY_CHOICES]
+    medicine_rows = [
+        (f'Medicine {n:05d}', rng.choice(categories), Decimal(rng.randint(50, 20000)) / 100,
+         today + timedelta(days=rng.randint(-30, 900)))
+        for n in range(volumes['medicines'])
+    ]
+    # Stock for the sales below plus plenty left for write benchmarks
+    stock = 10 * volumes['sales'] // volumes['medicines'] + 1000
+    timed_insert('medicines', Medicine, (
+        Medicine(name=name, category=category, quantity=stock, price=price, expiry_date=expiry)
+        for name, category, price, expiry in medicine_rows
+    ))
+    medicines = list(Medicine.objects.order_by('pk').values_list('pk', 'price', 'expiry_date'))
+    timed_insert('medicine_lots', MedicineLot, (
+        MedicineLot(medicine_id=pk, lot_number=f'LOT-{pk}', quantity=stock, expiry_date=expiry)
+        for pk, _, expiry in medicines
+    ))
+
+    timed_insert('patients', Animal, (
+        Animal(owner_name=name, owner_contact=contact, species=rng.choice(SPECIES),
+               status=rng.choice(['admitted', 'discharged', 'discharged']))
+        for name, contact in (owner(rng) for _ in range(volumes['patients']))
+    ))
+    patients = list(Animal.objects.values_list('pk', flat=True))
+    timed_insert('diagnoses', AnimalDiagnosis, (
+        AnimalDiagnosis(
+            animal_id=rng.choice(patients), diagnosis=diagnosis, prescribed_medicine=medicine,
+            dosage=f'{rng.randint(1, 20)} ml twice daily',
+            next_checkup=today + timedelta(days=rng.randint(-60, 60)) if rng.random() < 0.6 else None,
+        )
+        for diagnosis, medicine in (rng.choice(DIAGNOSES) for _ in range(volumes['diagnoses']))
+    ))
+
+    # One booking per slot, from a year ago onwards, so (date, time) stays unique
+    first_day = today - timedelta(days=365)
+    timed_insert('appointments', Appointment, (
+        Appointment(
+            owner_name=name, owner_contact=contact,
+            date=first_day + timedelta(days=n // len(SLOT_TIMES)), time=SLOT_TIMES[n % len(SLOT_TIMES)],
+        )
+        for n, (name, contact) in enumerate(owner(rng) for _ in range(volumes['appointments']))
+    ))
+
+    # Two years of sales, oldest first
+    start = datetime.combine(today - timedelta(days=730), datetime.min.time(), tzinfo=dt_timezone.utc)
+    step = timedelta(days=730) / volumes['sales']
+
+    def sales():
+        for n in range(volumes['sales']):
+            pk, price, _ = rng.choice(medicines)
+            quantity = rng.randint(1, 5)
+            yield Sale(medicine_id=pk, quantity_sold=quantity, total_price=quantity * price, sale_date=start + n * step)
+
+    timed_insert('sales', Sale, sales())
+
+    # What the signals would have maintained row by row
+    begun = time.perf_counter()
+    sold = dict(Sale.objects.values('medicine_id').annotate(units=Sum('quantity_sold')).values_list('medicine_id', 'units'))
+    with transaction.atomic():
+        for pk, _, _ in medicines:
+            Medicine.objects.filter(pk=pk).update(quantity=stock - sold.get(pk, 0))
+            MedicineLot.objects.filter(medicine_id=pk).update(quantity=stock - sold.get(pk, 0))
+    DailySalesRollup.objects.rebuild(batch_size=batch_size)
+    rebuild_dashboard_counters()
+    TableVersion.objects.bump(*VERSIONED_MODELS)
+    timings['derived'] = {'seconds': round(time.perf_counter() - begun, 2)}
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database', required=True, help='SQLite file to create')
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--batch-size', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args(argv)
+    if Path(args.database).exists():
+        parser.error(f'{args.database} already exists')
+
+    setup(database=args.database)
+    from django.core.management import call_command
+    from django.db import connection
+
+    call_command('migrate', verbosity=0)
+    with connection.cursor() as cursor:
+        # A throwaway database: skip the fsyncs
+        cursor.execute('PRAGMA synchronous = OFF')
+    started = time.perf_counter()
+    timings = generate(args.scale, args.batch_size, args.seed)
+    report('dataset', {
+        'database': args.database,
+        'scale': args.scale,
+        'tables': timings,
+        'seconds': round(time.perf_counter() - started, 2),
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Login storm: login throughput, and the latency of an unrelated endpoint
+while the logins are running, for a synchronous DRF login view against the
+async view that hashes on the bounded pool. Requests go through Django's
+ASGI handler in process.
+
+    python -m benchmarks.login_storm [--logins N] [--concurrency C]
+"""
+import argparse
+import asyncio
+import time
+
+from . import percentiles, report, scratch_database, setup
+
+PASSWORD = 'storm-password'
+PROBE_URL = '/api/dashboard/summary/'
+
+
+def sync_login_view():
+    """The login view as it was before hashing moved off the request thread."""
+    from django.contrib.auth import login
+    from rest_framework import status
+    from rest_framework.authtoken.models import Token
+    from rest_framework.response import Response
+    from rest_framework.views import APIView
+
+    from veterinary.serializers import UserLoginSerializer
+
+    class SyncLoginView(APIView):
+        def post(self, request):
+            serializer = UserLoginSerializer(data=request.data)
+            if serializer.is_valid():
+                user = serializer.validated_data['user']
+                login(request, user)
+                token, created = Token.objects.get_or_create(user=user)
+                return Response({'token': token.key}, status=status.HTTP_200_OK)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    return SyncLoginView.as_view()
+
+
+async def storm(client, url, emails, concurrency):
+    limit = asyncio.Semaphore(concurrency)
+    login_times, probe_times, failures = [], [], 0
+    done = asyncio.Event()
+
+    async def log_in(email):
+        nonlocal failures
+        async with limit:
+            start = time.perf_counter()
+            response = await client.post(url, {'email': email, 'password': PASSWORD}, content_type='application/json')
+            login_times.append(time.perf_counter() - start)
+            failures += response.status_code != 200
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get(PROBE_URL)
+            probe_times.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    prober = asyncio.ensure_future(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(log_in(email) for email in emails))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+
+    return {
+        'logins': len(emails),
+        'failures': failures,
+        'logins_per_second': round(len(emails) / elapsed, 2),
+        'login_latency': percentiles(login_times),
+        'probe_requests': len(probe_times),
+        'probe_latency': percentiles(probe_times),
+    }
+
+
+def run(logins, concurrency):
+    from django.conf import settings
+    from django.test import AsyncClient, override_settings
+    from django.urls import include, path
+    from rest_framework.authtoken.models import Token
+
+    from veterinary.models import CustomUser
+
+    emails = [f'storm{i}@example.com' for i in range(logins)]
+    for email in emails:
+        user = CustomUser.objects.create_user(email=email, username=email, full_name='Storm', password=PASSWORD)
+        Token.objects.create(user=user)
+
+    urlconf = type('urlconf', (), {'urlpatterns': [
+        path('sync-login/', sync_login_view()),
+        path('api/', include('veterinary.urls')),
+    ]})
+    results = {'password_hasher': settings.PASSWORD_HASHERS[0], 'hashing_workers': settings.PASSWORD_HASHING_WORKERS}
+    with override_settings(ROOT_URLCONF=urlconf):
+        for name, url in (('sync_view', '/sync-login/'), ('async_view', '/api/login/')):
+            results[name] = asyncio.run(storm(AsyncClient(), url, emails, concurrency))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    setup()
+    with scratch_database():
+        report('login_storm', run(args.logins, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
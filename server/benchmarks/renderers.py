@@ -0,0 +1,80 @@
+"""
+Renderers: time to encode (and parse back) list payloads, and their size.
+
+    python -m benchmarks.renderers [--rows N] [--repeat N]
+"""
+import argparse
+import io
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from . import percentiles, report, setup, timed
+
+
+def payloads(rows):
+    """Serialized /api/medicine/ and /api/sales/ lists of `rows` unsaved instances each."""
+    from veterinary.models import Medicine, Sale
+    from veterinary.serializers import MedicineSerializer, SaleSerializer
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    medicines = [
+        Medicine(
+            pk=pk, name=f'Medicine {pk}', category='antibiotic', quantity=pk % 500,
+            price=Decimal(pk % 1000) / 4, expiry_date=date(2030, 1, 1) + timedelta(days=pk % 365),
+        )
+        for pk in range(1, rows + 1)
+    ]
+    sales = [
+        Sale(
+            pk=pk, medicine=medicines[pk % len(medicines)], quantity_sold=pk % 9 + 1,
+            total_price=Decimal(pk % 1000) / 4, sale_date=start + timedelta(minutes=pk),
+        )
+        for pk in range(1, rows + 1)
+    ]
+    return {
+        'medicine': MedicineSerializer(medicines, many=True).data,
+        'sales': SaleSerializer(sales, many=True).data,
+    }
+
+
+def run(rows, repeat):
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from veterinary.renderers import MessagePackRenderer, ORJSONParser, ORJSONRenderer, msgpack
+
+    renderers = [JSONRenderer(), ORJSONRenderer()] + ([MessagePackRenderer()] if msgpack else [])
+    parsers = {'JSONRenderer': JSONParser(), 'ORJSONRenderer': ORJSONParser()}
+
+    results = {}
+    for name, data in payloads(rows).items():
+        results[name] = {'rows': rows}
+        for renderer in renderers:
+            label = type(renderer).__name__
+            body = renderer.render(data)
+            results[name][label] = {
+                'bytes': len(body),
+                'render': percentiles(timed(lambda: renderer.render(data), repeat)),
+            }
+            if label in parsers:
+                parser = parsers[label]
+                results[name][label]['parse'] = percentiles(timed(lambda: parser.parse(io.BytesIO(body)), repeat))
+            else:
+                results[name][label]['parse'] = percentiles(timed(lambda: msgpack.unpackb(body), repeat))
+    if not msgpack:
+        results['MessagePackRenderer'] = 'skipped: msgpack is not installed'
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    setup()
+    report('renderers', run(args.rows, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Latency (p50/p95/p99), throughput and queries per request for every route
+in veterinary/urls.py, each loaded on its own against a server subprocess.
+
+    python -m benchmarks.routes [--database bench.sqlite3] [--server asgi|wsgi]
+                                [--concurrency C] [--duration S] [--writes] [--output FILE]
+
+Without --database a small dataset is generated into a scratch database
+(see benchmarks.dataset for building a large one once and reusing it).
+Results are JSON, stamped with the commit and settings, so runs can be
+kept and compared.
+"""
+import argparse
+import datetime
+import subprocess
+import sys
+
+from . import SERVER_DIR, load, report, scratch_database, serve, setup
+
+# Query strings that make a route do its representative work
+QUERIES = {
+    'search': '?q=amina',
+    'medicine-get-expiring-lots': '?within=90d',
+    'sale-get-sales-timeseries': '?bucket=week',
+}
+
+# Routes loaded one request at a time: each response is the whole table
+SINGLE_CLIENT = {'medicine-export-medicines', 'sale-export-sales'}
+
+SKIPPED = {
+    'event-stream': 'open-ended stream; see benchmarks.asgi_vs_wsgi for async serving',
+    'user-register': 'password hashing; see benchmarks.login_storm',
+    'user-login': 'password hashing; see benchmarks.login_storm',
+    'medicine-import-medicines': 'takes a file upload',
+}
+
+
+def url_patterns(patterns, seen=None):
+    """(name, pattern) for each named route, first occurrence only, without the ?format suffix variants."""
+    seen = set() if seen is None else seen
+    for pattern in patterns:
+        if hasattr(pattern, 'url_patterns'):
+            yield from url_patterns(pattern.url_patterns, seen)
+        elif pattern.name and pattern.name not in seen and 'format' not in pattern.pattern.regex.groupindex:
+            seen.add(pattern.name)
+            yield pattern.name, pattern
+
+
+def methods(callback):
+    """HTTP method -> handler name for a route's view."""
+    if getattr(callback, 'actions', None):
+        return dict(callback.actions)
+    view_class = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+    if view_class is None:
+        return {'get': callback.__name__}
+    return {method: method for method in view_class.http_method_names if method != 'options' and hasattr(view_class, method)}
+
+
+def write_requests(name, path, medicine_id):
+    """(method, path, body) for the writes --writes exercises, or None to skip the route."""
+    if name == 'sale-list':
+        return 'POST', path, {'medicine': medicine_id, 'quantity_sold': 1}
+    if name == 'sale-create-checkout':
+        return 'POST', path, {'items': [{'medicine': medicine_id, 'quantity_sold': 1}]}
+    if name == 'medicine-restock-medicine':
+        return 'POST', path, {'quantity': 5, 'expiry_date': '2031-01-01'}
+    if name == 'contact-list':
+        return 'POST', path, {'subject': 'Benchmark', 'email': 'bench@example.com', 'message': 'Load test'}
+    return None
+
+
+def plan(writes=False):
+    """The requests to load per route, plus the routes left out and why."""
+    from django.urls import reverse
+
+    from veterinary import urls
+    from veterinary.models import Medicine
+
+    medicine_id = Medicine.objects.order_by('pk').values_list('pk', flat=True).first()
+    requests, skipped = {}, {}
+    for name, pattern in url_patterns(urls.urlpatterns):
+        if name in SKIPPED:
+            skipped[name] = SKIPPED[name]
+            continue
+        kwargs = {}
+        if 'pk' in pattern.pattern.regex.groupindex:
+            model = pattern.callback.cls.queryset.model
+            kwargs['pk'] = model.objects.order_by('pk').values_list('pk', flat=True).first()
+            if kwargs['pk'] is None:
+                skipped[name] = 'no rows to address'
+                continue
+        path = reverse(name, kwargs=kwargs)
+        handlers = methods(pattern.callback)
+        if 'get' in handlers:
+            requests[f'GET {name}'] = path + QUERIES.get(name, '')
+        unsafe = set(handlers) - {'get', 'head'}
+        if unsafe:
+            write = write_requests(name, path, medicine_id) if writes else None
+            if write:
+                requests[f'{write[0]} {name}'] = write
+            else:
+                reason = 'no request body defined for it' if writes else 'writes are loaded with --writes'
+                skipped[f"{'/'.join(sorted(unsafe)).upper()} {name}"] = reason
+    return requests, skipped
+
+
+def commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SERVER_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(database, server, concurrency, duration, writes):
+    from veterinary.models import Animal, Appointment, Medicine, Sale
+
+    requests, skipped = plan(writes)
+    results = {
+        'started_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': commit(),
+        'python': sys.version.split()[0],
+        'server': server,
+        'concurrency': concurrency,
+        'duration': duration,
+        'rows': {model.__name__: model.objects.count() for model in (Animal, Appointment, Medicine, Sale)},
+        'skipped': skipped,
+        'routes': {},
+    }
+    with serve(server, database) as host:
+        for label, entry in requests.items():
+            clients = 1 if label.split()[1] in SINGLE_CLIENT else concurrency
+            load(host, [entry], concurrency=1, duration=min(1.0, duration))  # warm up
+            results['routes'][label] = {
+                'request': entry if isinstance(entry, str) else ' '.join(entry[:2]),
+                'clients': clients,
+                **load(host, [entry], clients, duration),
+            }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database', help='SQLite file from benchmarks.dataset; a small scratch one otherwise')
+    parser.add_argument('--scale', type=float, default=0.01, help='dataset scale for the scratch database')
+    parser.add_argument('--server', choices=['asgi', 'wsgi'], default='asgi')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--writes', action='store_true', help='also load sales, checkout, restock and contact POSTs')
+    parser.add_argument('--output', help='write the JSON here as well as to stdout')
+    args = parser.parse_args(argv)
+
+    def finish(results):
+        report('routes', results)
+        if args.output:
+            with open(args.output, 'w') as stream:
+                report('routes', results, stream)
+
+    if args.database:
+        setup(database=args.database)
+        finish(run(args.database, args.server, args.concurrency, args.duration, args.writes))
+        return
+
+    setup()
+    from django.db import connection
+
+    from .dataset import generate
+
+    with scratch_database():
+        generate(scale=args.scale)
+        finish(run(connection.settings_dict['NAME'], args.server, args.concurrency, args.duration, args.writes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+"""Settings for servers started by the benchmarks: the app's own, pointed at a scratch database."""
+import os
+
+from api.settings import *  # noqa: F401,F403
+from api.settings import CACHES, DATABASES
+
+DATABASES["default"]["NAME"] = os.environ["BENCHMARK_DATABASE"]
+
+if os.environ.get("BENCHMARK_RESPONSE_CACHE") != "1":
+    # Measure the read paths themselves rather than cache hits
+    CACHES["responses"] = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+
+# SQLite tuning profiles for benchmarks.sqlite_contention
+SQLITE_PROFILE = os.environ.get("BENCHMARK_SQLITE_PROFILE", "tuned")
+if SQLITE_PROFILE == "default":
+    # Django's out-of-the-box SQLite: no pragmas, deferred transactions (the
+    # rollback journal is set on the file by benchmarks.sqlite_contention)
+    DATABASES["default"]["OPTIONS"] = {}
+elif SQLITE_PROFILE == "serialized":
+    SQLITE_SERIALIZE_WRITES = True
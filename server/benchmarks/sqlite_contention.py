@@ -0,0 +1,75 @@
+"""
+Concurrent sales and reads against SQLite with Django's default settings,
+with the WAL/pragma tuning, and with the tuning plus the single-writer
+queue. Reports throughput, latency and failed requests ("database is
+locked" surfaces as a 500) for readers and writers separately.
+
+    python -m benchmarks.sqlite_contention [--workers W] [--writers N] [--readers N]
+"""
+import argparse
+import threading
+from datetime import date
+from decimal import Decimal
+
+from . import load, report, scratch_database, serve, setup
+
+# Profile name -> journal mode. The mode is stored in the database file and
+# cannot change while other connections have it open, so it is set here
+# before each server starts rather than by the server's own pragmas.
+PROFILES = {'default': 'delete', 'tuned': 'wal', 'serialized': 'wal'}
+READ_PATHS = ['/api/medicine/', '/api/sales/', '/api/dashboard/summary/']
+
+
+def seed(medicines):
+    from veterinary.models import Medicine
+
+    return Medicine.objects.bulk_create(
+        Medicine(
+            name=f'Medicine {i}', category='general', quantity=10_000_000,
+            price=Decimal('2.50'), expiry_date=date(2030, 1, 1),
+        )
+        for i in range(medicines)
+    )
+
+
+def contend(host, medicine_ids, writers, readers, duration):
+    writes = [('POST', '/api/sales/', {'medicine': pk, 'quantity_sold': 1}) for pk in medicine_ids]
+    results = {}
+
+    def write_load():
+        results['writes'] = load(host, writes, concurrency=writers, duration=duration)
+
+    writer = threading.Thread(target=write_load)
+    writer.start()
+    results['reads'] = load(host, READ_PATHS, concurrency=readers, duration=duration)
+    writer.join()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes')
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    setup()
+    from django.db import connection
+
+    with scratch_database():
+        medicine_ids = [medicine.pk for medicine in seed(20)]
+        database = connection.settings_dict['NAME']
+        results = {'workers': args.workers, 'writers': args.writers, 'readers': args.readers}
+        for profile, journal_mode in PROFILES.items():
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA journal_mode = {journal_mode}')
+            connection.close()
+            with serve('wsgi', database, extra_args=['--workers', str(args.workers)],
+                       env={'BENCHMARK_SQLITE_PROFILE': profile}) as host:
+                results[profile] = contend(host, medicine_ids, args.writers, args.readers, args.duration)
+        report('sqlite_contention', results)
+
+
+if __name__ == '__main__':
+    main()
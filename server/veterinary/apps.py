@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class VeterinaryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "veterinary"
+
+    def ready(self):
+        from . import authentication, database, events, instrumentation, signals, slow_queries  # noqa: F401
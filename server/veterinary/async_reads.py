@@ -0,0 +1,113 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.shortcuts import aget_object_or_404
+from rest_framework.response import Response
+
+from .conditional import ConditionalGetMixin, response_cache
+
+
+class AsyncReadMixin(ConditionalGetMixin):
+    """
+    Serve list, retrieve and any `async def` action natively under ASGI.
+
+    DRF views are synchronous, so under ASGI Django runs each of them on its
+    one shared sync thread. Requests routed to an async handler here are
+    dispatched on the event loop instead: rows are read with the async ORM
+    and serialized without holding that thread. Every other method (writes,
+    sync actions) goes through DRF exactly as before.
+
+    Authentication, permission and throttle checks run through the ordinary
+    sync `initial()`, since DRF's policy classes may query the database.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        methods = {method for method, action in actions.items() if iscoroutinefunction(getattr(cls, action))}
+        if 'get' in methods:
+            methods.add('head')
+        if not methods:
+            return view
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            if request.method.lower() in methods:
+                # dispatch() hands back the adispatch() coroutine
+                return await view(request, *args, **kwargs)
+            return await sync_view(request, *args, **kwargs)
+
+        async_view.__name__ = view.__name__
+        async_view.__doc__ = view.__doc__
+        for attribute in ('cls', 'initkwargs', 'actions', 'csrf_exempt'):
+            setattr(async_view, attribute, getattr(view, attribute))
+        return async_view
+
+    def dispatch(self, request, *args, **kwargs):
+        if iscoroutinefunction(getattr(self, request.method.lower(), None)):
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """APIView.dispatch with the handler awaited on the event loop."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        self._dispatching_async = True
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, request.method.lower())
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        entry = getattr(self, '_pending_cache_entry', None)
+        if entry:
+            await response_cache().aset(*entry)
+        return self.response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if not getattr(self, '_dispatching_async', False):
+            return super().finalize_response(request, response, *args, **kwargs)
+        # Skip ConditionalGetMixin's blocking cache write; adispatch awaits it instead
+        response = super(ConditionalGetMixin, self).finalize_response(request, response, *args, **kwargs)
+        self._pending_cache_entry = self.response_cache_entry(response)
+        return response
+
+    async def list(self, request, *args, **kwargs):
+        return await self.aconditional_response(self.alist, request, *args, **kwargs)
+
+    async def retrieve(self, request, *args, **kwargs):
+        return await self.aconditional_response(self.aretrieve, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = None
+        if hasattr(self.paginator, 'apaginate_queryset'):
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        elif self.paginator is not None:
+            page = await sync_to_async(self.paginator.paginate_queryset)(queryset, request, view=self)
+        if page is None:
+            rows = [obj async for obj in queryset.aiterator()]
+            return Response(self.get_serializer(rows, many=True).data)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+    async def aget_object(self):
+        """GenericAPIView.get_object with the row fetched by the async ORM."""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await aget_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
@@ -0,0 +1,67 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .models import CustomUser
+
+
+def token_cache():
+    return caches[getattr(settings, 'TOKEN_CACHE_ALIAS', 'tokens')]
+
+
+def token_cache_key(key):
+    # Hashed so raw credentials never sit in a shared cache
+    return 'token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that remembers which user a token belongs to.
+
+    A hit needs no query at all; a miss does the usual Token + user lookup
+    and stores the pair for the cache alias' TIMEOUT. Entries are dropped as
+    soon as the token is deleted or rotated or its user is saved or deleted,
+    so deactivating a user takes effect on the next request. Unknown tokens
+    are never cached.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        cached = token_cache().get(cache_key)
+        if cached is not None:
+            return cached
+        user, token = super().authenticate_credentials(key)
+        token_cache().set(cache_key, (user, token))
+        return user, token
+
+
+def forget_tokens(*keys):
+    """Drop cached entries once the change commits, so a concurrent miss cannot re-cache the old row."""
+    if keys:
+        cache_keys = [token_cache_key(key) for key in keys]
+        transaction.on_commit(lambda: token_cache().delete_many(cache_keys))
+
+
+@receiver(post_save, sender=Token, dispatch_uid='token-cache-token-saved')
+@receiver(post_delete, sender=Token, dispatch_uid='token-cache-token-deleted')
+def token_changed(sender, instance, **kwargs):
+    forget_tokens(instance.key)
+
+
+# User fields that decide whether a cached (user, token) pair may still authenticate or authorize
+AUTH_FIELDS = {'password', 'is_active', 'is_staff', 'is_superuser'}
+
+
+# Deleting a user cascades to its token, which is handled above
+@receiver(post_save, sender=CustomUser, dispatch_uid='token-cache-user-saved')
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # Saves naming only other fields (e.g. login's last_login) leave the cache alone
+    if update_fields is not None and AUTH_FIELDS.isdisjoint(update_fields):
+        return
+    forget_tokens(*Token.objects.filter(user_id=instance.pk).values_list('key', flat=True))
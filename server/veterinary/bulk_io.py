@@ -0,0 +1,160 @@
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .models import Medicine, TableVersion
+from .sales import reconcile_lots_in_bulk
+from .serializers import MedicineImportSerializer
+from .signals import bulk_created
+
+FORMATS = ('csv', 'ndjson')
+
+# Only this many row errors are returned; the total is always reported
+MAX_REPORTED_ERRORS = 100
+
+
+def read_records(stream, fmt):
+    """Yield (row_number, record) pairs from a text stream without loading it all."""
+    if fmt == 'csv':
+        # Row 1 is the header, so data rows start at 2 like a spreadsheet
+        for row_number, record in enumerate(csv.DictReader(stream), start=2):
+            yield row_number, record
+    elif fmt == 'ndjson':
+        for row_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record = e
+            yield row_number, record
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {', '.join(FORMATS)}")
+
+
+def import_medicines(records, batch_size=500):
+    """
+    Upsert medicines keyed on their unique name, one batch at a time.
+
+    Every record is validated on its own; bad rows are reported and skipped
+    while the rest of the file carries on loading. Lots follow each quantity
+    change in the same transaction, as they do for an edit through the API.
+    """
+    report = {'processed': 0, 'created': 0, 'updated': 0, 'error_count': 0, 'errors': []}
+
+    def add_error(row_number, errors):
+        report['error_count'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'row': row_number, 'errors': errors})
+
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, batch_size))
+        if not chunk:
+            break
+
+        batch = {}
+        for row_number, record in chunk:
+            report['processed'] += 1
+            if not isinstance(record, dict):
+                add_error(row_number, {'non_field_errors': [str(record) or 'Expected an object']})
+                continue
+            serializer = MedicineImportSerializer(data=record)
+            if serializer.is_valid():
+                # A later row for the same name wins, as it would one row at a time
+                batch[serializer.validated_data['name']] = Medicine(**serializer.validated_data)
+            else:
+                add_error(row_number, serializer.errors)
+
+        if batch:
+            created, updated = _upsert_medicines(list(batch.values()))
+            report['created'] += created
+            report['updated'] += updated
+
+    return report
+
+
+def _upsert_medicines(medicines):
+    with transaction.atomic():
+        names = [m.name for m in medicines]
+        # Locked so the lots are reconciled against the quantities being replaced
+        previous = dict(
+            Medicine.objects.select_for_update().filter(name__in=names).order_by('pk').values_list('name', 'quantity')
+        )
+        Medicine.objects.bulk_create(
+            medicines,
+            update_conflicts=True,
+            unique_fields=['name'],
+            update_fields=['category', 'quantity', 'price', 'expiry_date'],
+        )
+        ids = dict(Medicine.objects.filter(name__in=names).values_list('name', 'pk'))
+        for medicine in medicines:
+            medicine.pk = ids[medicine.name]
+        created = [m for m in medicines if m.name not in previous]
+        if created:
+            bulk_created.send(sender=Medicine, instances=created)
+        else:
+            # Only updates: bulk_created is not sent, but the rows still changed
+            TableVersion.objects.bump(Medicine)
+        reconcile_lots_in_bulk(medicines, {ids[name]: quantity for name, quantity in previous.items()})
+    return len(created), len(medicines) - len(created)
+
+
+class _Echo:
+    """File-like object whose write() hands the line straight back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def _row_writer(fields, fmt):
+    """(header line or None, function turning one values_list row into a line) for an export format."""
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        return writer.writerow(fields), writer.writerow
+    if fmt == 'ndjson':
+        encoder = DjangoJSONEncoder()
+        return None, lambda row: encoder.encode(dict(zip(fields, row))) + '\n'
+    raise ValueError(f"Unsupported format {fmt!r}; expected one of {', '.join(FORMATS)}")
+
+
+def stream_rows(queryset, fields, fmt, chunk_size=2000):
+    """
+    Yield a queryset as CSV or NDJSON text, one row at a time.
+
+    Rows come from a server-side `.iterator(chunk_size=...)`, so memory use
+    stays flat however many rows are exported.
+    """
+    header, write = _row_writer(fields, fmt)
+    if header is not None:
+        yield header
+    for row in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+        yield write(row)
+
+
+async def astream_rows(queryset, fields, fmt, chunk_size=2000):
+    """
+    stream_rows for ASGI servers, as an async generator.
+
+    Django's ASGI handler only streams async iterators; a sync generator
+    is read into a list first, which would hold the whole export in memory.
+    Rows are pulled from the same server-side iterator, one chunk per trip
+    to the sync thread, like QuerySet.aiterator() (which on Django 5.1 runs
+    values_list() queries on the event loop and fails).
+    """
+    header, write = _row_writer(fields, fmt)
+    if header is not None:
+        yield header
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    next_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+    try:
+        while chunk := await next_chunk():
+            for row in chunk:
+                yield write(row)
+    finally:
+        # Releases the server-side cursor if the client goes away mid-export
+        await sync_to_async(rows.close)()
@@ -0,0 +1,181 @@
+import re
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # optional; "br" is offered only when it is installed
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional; "zstd" is offered only when it is installed
+    zstandard = None
+
+QUALITY = re.compile(r'q\s*=\s*([0-9.]+)')
+
+
+# Levels are picked for on-the-fly compression: most of the size win for
+# little CPU. Higher levels cost far more time for a few percent.
+class GzipEncoder:
+    def __init__(self):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=4)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+ENCODERS = {'gzip': GzipEncoder}
+if brotli:
+    ENCODERS['br'] = BrotliEncoder
+if zstandard:
+    ENCODERS['zstd'] = ZstdEncoder
+
+
+def choose_encoding(accept_encoding, encodings):
+    """
+    The encoding the client weights highest in its Accept-Encoding header, or None.
+
+    `encodings` is in server preference order, which settles ties.
+    """
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        match = QUALITY.search(params)
+        try:
+            weights[name.strip().lower()] = float(match.group(1)) if match else 1.0
+        except ValueError:
+            continue
+    default = weights.get('*', 0)
+    best = max(encodings, key=lambda encoding: weights.get(encoding, default), default=None)
+    if best is None or weights.get(best, default) <= 0:
+        return None
+    return best
+
+
+# Streams like the CSV export yield one short row at a time; feeding the
+# compressor batches of at least this many bytes saves most of the per-call
+# cost. Output goes out whenever the compressor emits a block, so memory
+# stays bounded by the batch plus the compressor's window.
+STREAM_BATCH_SIZE = 16 * 1024
+
+
+def compress_stream(encoder, chunks):
+    batch, size = [], 0
+    for chunk in chunks:
+        batch.append(chunk)
+        size += len(chunk)
+        if size >= STREAM_BATCH_SIZE:
+            data = encoder.compress(b''.join(batch))
+            batch, size = [], 0
+            if data:
+                yield data
+    yield encoder.compress(b''.join(batch)) + encoder.finish()
+
+
+async def acompress_stream(encoder, chunks):
+    batch, size = [], 0
+    async for chunk in chunks:
+        batch.append(chunk)
+        size += len(chunk)
+        if size >= STREAM_BATCH_SIZE:
+            data = encoder.compress(b''.join(batch))
+            batch, size = [], 0
+            if data:
+                yield data
+    yield encoder.compress(b''.join(batch)) + encoder.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with the best of zstd/br/gzip the client accepts.
+
+    Only COMPRESSION_CONTENT_TYPES are compressed, and only when at least
+    COMPRESSION_MIN_SIZE bytes long. Streaming responses (CSV/NDJSON
+    exports) are compressed as they are produced, never buffered whole.
+    ETags become weak, since the bytes now depend on the encoding.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.encodings = [
+            encoding for encoding in getattr(settings, 'COMPRESSION_ENCODINGS', ['gzip']) if encoding in ENCODERS
+        ]
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.content_types = set(getattr(settings, 'COMPRESSION_CONTENT_TYPES', ['application/json']))
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if (
+            response.has_header('Content-Encoding')
+            or content_type not in self.content_types
+            or 'no-transform' in response.get('Cache-Control', '')
+            or (not response.streaming and len(response.content) < self.min_size)
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.encodings)
+        if encoding is None:
+            return response
+
+        encoder = ENCODERS[encoding]()
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(encoder, response.streaming_content)
+            else:
+                response.streaming_content = compress_stream(encoder, response.streaming_content)
+            del response['Content-Length']
+        else:
+            compressed = encoder.compress(response.content) + encoder.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
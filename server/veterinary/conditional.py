@@ -0,0 +1,158 @@
+import hashlib
+import threading
+from functools import partial, wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import TableVersion
+
+
+class CacheStats:
+    """Hit/miss counts for the response cache in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / lookups, 4) if lookups else None}
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+response_cache_stats = CacheStats()
+
+
+def response_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'responses')]
+
+
+def versioned(method):
+    """Give a read-only @action the same 304 and caching treatment as list/retrieve."""
+
+    if iscoroutinefunction(method):
+        @wraps(method)
+        async def async_wrapper(self, request, *args, **kwargs):
+            return await self.aconditional_response(partial(method, self), request, *args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        return self.conditional_response(partial(method, self), request, *args, **kwargs)
+
+    return wrapper
+
+
+class ConditionalGetMixin:
+    """
+    Answer If-None-Match / If-Modified-Since on list and detail reads with 304,
+    and serve repeat reads from the response cache.
+
+    The validators come from the TableVersion rows of `version_models` (the
+    viewset's own model by default), so an unchanged resource is recognised
+    with one primary-key lookup, before the main queryset runs or anything is
+    serialized. List any other table whose columns the serializer shows.
+
+    Cached responses are keyed on the same validators plus the caller, so a
+    write to any of those tables makes the old entries unreachable at once;
+    they are then evicted as least recently used.
+    """
+
+    version_models = ()
+    cache_responses = True
+
+    def get_version_models(self):
+        return self.version_models or (self.get_queryset().model,)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, view, request, *args, **kwargs):
+        etag, last_modified = self.validators(request, *TableVersion.objects.stamp(*self.get_version_models()))
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None and self.cache_responses:
+            cache_key = self.response_cache_key(request, etag)
+            response = self.cached_response(cache_key, response_cache().get(cache_key))
+        if response is None:
+            response = view(request, *args, **kwargs)
+        return self.add_validators(response, etag, last_modified)
+
+    async def aconditional_response(self, view, request, *args, **kwargs):
+        """conditional_response for async views, reading versions and the cache without blocking."""
+        stamps, updated_at = await TableVersion.objects.astamp(*self.get_version_models())
+        etag, last_modified = self.validators(request, stamps, updated_at)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None and self.cache_responses:
+            cache_key = self.response_cache_key(request, etag)
+            response = self.cached_response(cache_key, await response_cache().aget(cache_key))
+        if response is None:
+            response = await view(request, *args, **kwargs)
+        return self.add_validators(response, etag, last_modified)
+
+    def validators(self, request, stamps, updated_at):
+        # The same URL can be rendered as JSON or the browsable API
+        key = f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}|{sorted(stamps.items())}"
+        etag = quote_etag(hashlib.sha1(key.encode()).hexdigest())
+        return etag, updated_at and int(updated_at.timestamp())
+
+    def add_validators(self, response, etag, last_modified):
+        if response.status_code not in (200, 304):
+            return response
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def response_cache_key(self, request, etag):
+        return f"{etag}|{request.user.pk or 'anonymous'}"
+
+    def cached_response(self, cache_key, cached):
+        response_cache_stats.record(cached is not None)
+        if cached is None:
+            # finalize_response stores the rendered body under this key
+            self._response_cache_key = cache_key
+            return None
+        content, content_type = cached
+        response = HttpResponse(content, content_type=content_type)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        entry = self.response_cache_entry(response)
+        if entry:
+            response_cache().set(*entry)
+        return response
+
+    def response_cache_entry(self, response):
+        """Render a response that should be cached and return its (key, value), else None."""
+        cache_key = getattr(self, '_response_cache_key', None)
+        renderer = getattr(response, 'accepted_renderer', None)
+        # The browsable API embeds per-user forms and CSRF tokens, so only plain renderings are kept
+        if not (cache_key and response.status_code == 200 and renderer and renderer.format != 'api'):
+            return None
+        response.render()
+        response['X-Cache'] = 'MISS'
+        return cache_key, (response.content, response['Content-Type'])
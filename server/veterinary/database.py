@@ -0,0 +1,64 @@
+import fcntl
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+UNSAFE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+@contextmanager
+def write_lock(database='default'):
+    """
+    Hold the single-writer lock for an SQLite database.
+
+    The lock is an flock on a file beside the database, so it queues writers
+    across threads and worker processes alike; waiters block in the kernel
+    instead of spinning on SQLite's busy handler.
+    """
+    with open(f"{connections[database].settings_dict['NAME']}.write-lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SerializedWriteMiddleware:
+    """
+    Let one POST/PUT/PATCH/DELETE request at a time run against SQLite.
+
+    Enabled by SQLITE_SERIALIZE_WRITES. Reads are untouched: in WAL mode they
+    never wait for the writer.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQLITE_SERIALIZE_WRITES', False) or connections['default'].vendor != 'sqlite':
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.method not in UNSAFE_METHODS:
+            return self.get_response(request)
+        with write_lock():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.method not in UNSAFE_METHODS:
+            return await self.get_response(request)
+        lock = write_lock()
+        # Wait for the lock off the event loop
+        await sync_to_async(lock.__enter__, thread_sensitive=False)()
+        try:
+            return await self.get_response(request)
+        finally:
+            lock.__exit__(None, None, None)
@@ -0,0 +1,168 @@
+import asyncio
+import itertools
+import json
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Animal, Appointment, Medicine, Sale, LOW_STOCK_THRESHOLD
+from .signals import bulk_created, stock_decremented
+
+
+class InProcessBroker:
+    """
+    Fan events out to every subscriber in this process.
+
+    publish() may be called from any thread; each subscriber owns a bounded
+    asyncio queue on its own event loop, and a subscriber that falls behind
+    loses its oldest events rather than holding up the publisher.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def publish(self, event_type, data):
+        event = {'id': next(self._ids), 'type': event_type, 'data': data}
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # The subscriber's loop has already shut down
+                self.unsubscribe(subscription)
+
+    def subscribe(self):
+        """Start receiving events right away; iterate the result with `async for`."""
+        subscription = _Subscription(self, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+
+class _Subscription:
+    def __init__(self, broker, loop, queue_size):
+        self.broker = broker
+        self.loop = loop
+        self.queue = asyncio.Queue(queue_size)
+
+    def offer(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    async def aclose(self):
+        self.broker.unsubscribe(self)
+
+
+class RedisBroker:
+    """
+    Pub/sub through a Redis-compatible server so every worker process sees every event.
+
+    Needs the optional `redis` package; point EVENT_BROKER_URL at the server.
+    """
+
+    channel = 'veterinary-events'
+
+    def __init__(self, url=None):
+        import redis
+
+        self.url = url or getattr(settings, 'EVENT_BROKER_URL', 'redis://localhost:6379/0')
+        self._client = redis.Redis.from_url(self.url)
+        self._ids = itertools.count(1)
+
+    def publish(self, event_type, data):
+        event = {'id': next(self._ids), 'type': event_type, 'data': data}
+        self._client.publish(self.channel, json.dumps(event, cls=DjangoJSONEncoder))
+
+    async def subscribe(self):
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    yield json.loads(message['data'])
+        finally:
+            await pubsub.unsubscribe(self.channel)
+            await client.aclose()
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """The broker named by EVENT_BROKER (defaults to the in-process one)."""
+    broker_class = import_string(getattr(settings, 'EVENT_BROKER', 'veterinary.events.InProcessBroker'))
+    return broker_class()
+
+
+def publish_on_commit(event_type, data):
+    """Publish once the surrounding transaction commits, so rolled-back writes never reach dashboards."""
+    transaction.on_commit(lambda: get_broker().publish(event_type, data))
+
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], cls=DjangoJSONEncoder)}\n\n"
+
+
+def sale_event(sale):
+    return {
+        'id': sale.pk, 'medicine': sale.medicine_id, 'quantity_sold': sale.quantity_sold,
+        'total_price': sale.total_price, 'sale_date': sale.sale_date,
+    }
+
+
+@receiver(post_save, sender=Sale, dispatch_uid='events-sale-saved')
+def sale_saved(sender, instance, created, **kwargs):
+    if created:
+        publish_on_commit('sale.created', sale_event(instance))
+
+
+@receiver(bulk_created, sender=Sale, dispatch_uid='events-sales-bulk-created')
+def sales_bulk_created(sender, instances, **kwargs):
+    for sale in instances:
+        publish_on_commit('sale.created', sale_event(sale))
+
+
+@receiver(stock_decremented, sender=Medicine, dispatch_uid='events-low-stock')
+def stock_crossed_threshold(sender, quantities, **kwargs):
+    """Report medicines this decrement took from at/above LOW_STOCK_THRESHOLD to below it."""
+    for medicine in Medicine.objects.filter(pk__in=quantities, quantity__lt=LOW_STOCK_THRESHOLD).values(
+        'id', 'name', 'quantity'
+    ):
+        if medicine['quantity'] + quantities[medicine['id']] >= LOW_STOCK_THRESHOLD:
+            publish_on_commit('medicine.low_stock', medicine)
+
+
+@receiver(post_save, sender=Appointment, dispatch_uid='events-appointment-saved')
+def appointment_saved(sender, instance, created, **kwargs):
+    publish_on_commit('appointment.created' if created else 'appointment.updated', {
+        'id': instance.pk, 'date': instance.date, 'time': instance.time,
+    })
+
+
+@receiver(post_save, sender=Animal, dispatch_uid='events-patient-saved')
+def patient_saved(sender, instance, created, **kwargs):
+    publish_on_commit('patient.created' if created else 'patient.updated', {
+        'animal_id': instance.pk, 'species': instance.species, 'status': instance.status,
+    })
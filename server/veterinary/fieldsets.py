@@ -0,0 +1,96 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def requested(request, param):
+    """The comma-separated names in ?<param>= on a read, or None when there are none."""
+    if request is None or request.method not in SAFE_METHODS or param not in request.query_params:
+        return None
+    names = {name.strip() for name in request.query_params[param].split(',') if name.strip()}
+    return names or None
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin for ?fields=a,b and ?expand=relation on GET requests.
+
+    `fields` keeps only the named fields, so method fields that were not
+    asked for are never computed. `expand` replaces a foreign key's id with
+    the related object, serialized by the class given for it in
+    Meta.expandable_fields. Fields whose value comes from other columns than
+    their name (e.g. method fields) list those in Meta.field_sources so
+    narrow_queryset() can load just what the output needs.
+
+    Only the top-level serializer is narrowed; expanded objects are whole.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_sparse_root():
+            return fields
+        request = self.context.get('request')
+        only, expand = requested(request, 'fields'), requested(request, 'expand') or set()
+        if only is None and not expand:
+            return fields
+
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        errors = {}
+        if expand - set(expandable):
+            errors['expand'] = [f"Cannot expand: {', '.join(sorted(expand - set(expandable)))}"]
+        if only is not None and only - set(fields) - expand:
+            errors['fields'] = [f"Unknown fields: {', '.join(sorted(only - set(fields) - expand))}"]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        for name in expand:
+            fields[name] = expandable[name](read_only=True)
+        if only is not None:
+            fields = {name: field for name, field in fields.items() if name in only or name in expand}
+        return fields
+
+    def is_sparse_root(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    def narrow_queryset(self, queryset):
+        """Load only the columns and joins the requested fields need; unchanged when nothing was requested."""
+        request = self.context.get('request')
+        if requested(request, 'fields') is None and not requested(request, 'expand'):
+            return queryset
+
+        model = queryset.model
+        expand = requested(request, 'expand') or set()
+        field_sources = getattr(self.Meta, 'field_sources', {})
+        columns, joins = {model._meta.pk.name}, set(expand)
+        for name, field in self.fields.items():
+            if name in expand:
+                columns.add(name)
+                continue
+            sources = field_sources.get(name) or ([] if field.source == '*' else [field.source.replace('.', '__')])
+            for source in sources:
+                try:
+                    model._meta.get_field(source.split('__')[0])
+                except FieldDoesNotExist:
+                    # Computed from something other than columns; load the whole row
+                    return queryset
+                columns.add(source)
+                if '__' in source:
+                    joins.add(source.rsplit('__', 1)[0])
+        # An expanded relation is serialized whole, so none of its columns may
+        # be deferred (each would be lazy-loaded per row, and fail under async)
+        columns = {column for column in columns if '__' not in column or column.split('__')[0] not in expand}
+        queryset = queryset.select_related(None)
+        if joins:
+            queryset = queryset.select_related(*joins)
+        return queryset.only(*columns)
+
+
+class SparseFieldsViewMixin:
+    """Narrow list/retrieve querysets to the ?fields=/?expand= the serializer will output."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            queryset = self.get_serializer().narrow_queryset(queryset)
+        return queryset
@@ -0,0 +1,40 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def hashing_executor():
+    """The shared pool for password work, sized by PASSWORD_HASHING_WORKERS."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'PASSWORD_HASHING_WORKERS', 2),
+                thread_name_prefix='password-hashing',
+            )
+        return _executor
+
+
+async def run_in_hashing_pool(func, *args, **kwargs):
+    """
+    Await func(*args, **kwargs) on the password hashing pool.
+
+    Under ASGI, sync views share one thread, so a slow password hash there
+    holds up every other sync request. The pool keeps at most
+    PASSWORD_HASHING_WORKERS hashes running; the rest wait their turn without
+    blocking the event loop. Each job may use the ORM and closes its
+    connection afterwards as a request would.
+    """
+    def job():
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return await sync_to_async(job, thread_sensitive=False, executor=hashing_executor())()
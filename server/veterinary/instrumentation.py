@@ -0,0 +1,95 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+# The recorder for the request being served. Context variables follow a
+# request into sync_to_async threads, so queries are attributed correctly
+# whichever thread or connection runs them.
+current_recorder = ContextVar('query_recorder', default=None)
+
+
+class QueryRecorder:
+    """Database execute wrapper that counts queries and their total wall time."""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+@receiver(connection_created, dispatch_uid='install-query-recorder')
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class QueryBudgetMiddleware:
+    """
+    Record the number and total time of SQL queries issued while serving each request.
+
+    The totals are reported in a Server-Timing header, and a warning is logged when a
+    view goes over QUERY_BUDGET queries so N+1 regressions show up in production logs.
+    The recorder is left on request.query_recorder for outer middleware (metrics).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.budget = getattr(settings, 'QUERY_BUDGET', 25)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = request.query_recorder = QueryRecorder(request)
+        token = current_recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        recorder = request.query_recorder = QueryRecorder(request)
+        token = current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.report(request, response, recorder)
+
+    def report(self, request, response, recorder):
+        response['Server-Timing'] = f'db;dur={recorder.duration * 1000:.2f};desc="{recorder.count} queries"'
+        if self.budget is not None and recorder.count > self.budget:
+            match = getattr(request, 'resolver_match', None)
+            logger.warning(
+                'Query budget exceeded: %s %s (%s) ran %d queries in %.1f ms (budget %d)',
+                request.method, request.path, match.view_name if match else '-',
+                recorder.count, recorder.duration * 1000, self.budget,
+            )
+        return response
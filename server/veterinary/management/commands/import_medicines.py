@@ -0,0 +1,35 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from veterinary.bulk_io import FORMATS, import_medicines, read_records
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or NDJSON file of medicines into the catalog, upserting on name."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path)
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, path, format=None, batch_size=500, **options):
+        fmt = format or path.suffix.lstrip('.').lower()
+        if fmt not in FORMATS:
+            raise CommandError(f"Cannot tell the format of {path}; pass --format csv or --format ndjson.")
+        if not path.exists():
+            raise CommandError(f"{path} does not exist.")
+
+        with path.open(newline='', encoding='utf-8') as stream:
+            try:
+                report = import_medicines(read_records(stream, fmt), batch_size=batch_size)
+            except UnicodeDecodeError as e:
+                raise CommandError(f"{path} is not UTF-8 encoded ({e.reason}); re-save it as UTF-8.")
+
+        for error in report['errors']:
+            self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['processed']} rows: {report['created']} created, "
+            f"{report['updated']} updated, {report['error_count']} rejected"
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from veterinary.signals import rebuild_dashboard_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard counters (row counts and total revenue) from the tables."
+
+    def handle(self, **options):
+        rebuild_dashboard_counters()
+        self.stdout.write(self.style.SUCCESS("Rebuilt the dashboard counters"))
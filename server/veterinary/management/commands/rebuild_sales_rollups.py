@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from veterinary.models import DailySalesRollup
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily sales rollup table from the full Sale history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, batch_size=1000, **options):
+        rows = DailySalesRollup.objects.rebuild(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} daily sales rollup rows"))
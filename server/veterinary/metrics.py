@@ -0,0 +1,210 @@
+import threading
+import time
+from bisect import bisect_left
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+# Upper bounds, in seconds, of the request latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNMATCHED = '<unmatched>'
+
+
+class Shard:
+    """One thread's share of the totals; only its own thread ever writes to it."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.requests = {}  # (route, method, status) -> count
+        self.latency = {}  # (route, method) -> [count per bucket..., +Inf count, sum]
+        self.queries = {}  # route -> [queries, seconds]
+        self.cache = {}  # (route, "hit" | "miss") -> count
+
+
+class RequestMetrics:
+    """
+    Per-route request, database and response cache metrics for this process.
+
+    Every thread records into its own Shard without taking a lock (under
+    ASGI the event loop thread has one shard for all its coroutines), and
+    a scrape adds the shards up. Each worker process keeps its own totals,
+    so Prometheus should scrape every worker, as it does for any
+    multi-process server without a shared store.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def started(self):
+        self.shard().in_flight += 1
+
+    def finished(self, route, method, status, seconds, recorder=None, cache=None):
+        shard = self.shard()
+        shard.in_flight -= 1
+        key = (route, method, status)
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+
+        histogram = shard.latency.get((route, method))
+        if histogram is None:
+            histogram = shard.latency[(route, method)] = [0] * (len(self.buckets) + 1) + [0.0]
+        histogram[bisect_left(self.buckets, seconds)] += 1
+        histogram[-1] += seconds
+
+        if recorder is not None:
+            totals = shard.queries.get(route)
+            if totals is None:
+                totals = shard.queries[route] = [0, 0.0]
+            totals[0] += recorder.count
+            totals[1] += recorder.duration
+        if cache:
+            shard.cache[(route, cache)] = shard.cache.get((route, cache), 0) + 1
+
+    def collect(self):
+        """Sum every thread's shard; list() copies each dict atomically, so writers never have to wait."""
+        with self._shards_lock:
+            shards = list(self._shards)
+        in_flight, requests, latency, queries, cache = 0, {}, {}, {}, {}
+        for shard in shards:
+            in_flight += shard.in_flight
+            for key, count in list(shard.requests.items()):
+                requests[key] = requests.get(key, 0) + count
+            for key, histogram in list(shard.latency.items()):
+                total = latency.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+                for index, value in enumerate(list(histogram)):
+                    total[index] += value
+            for key, (count, seconds) in list(shard.queries.items()):
+                total = queries.setdefault(key, [0, 0.0])
+                total[0] += count
+                total[1] += seconds
+            for key, count in list(shard.cache.items()):
+                cache[key] = cache.get(key, 0) + count
+        return in_flight, requests, latency, queries, cache
+
+    def exposition(self):
+        """The metrics in the Prometheus text exposition format (version 0.0.4)."""
+        in_flight, requests, latency, queries, cache = self.collect()
+        lines = [
+            '# HELP http_requests_in_flight Requests being served right now.',
+            '# TYPE http_requests_in_flight gauge',
+            f'http_requests_in_flight {in_flight}',
+            '# HELP http_requests_total Requests served, by route, method and status code.',
+            '# TYPE http_requests_total counter',
+        ]
+        for (route, method, status), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{labels(route=route, method=method, status=status)} {count}')
+
+        lines += [
+            '# HELP http_request_duration_seconds Time to serve a request, by route and method.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (route, method), histogram in sorted(latency.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), histogram[:-1]):
+                cumulative += count
+                le = bound if bound == '+Inf' else repr(float(bound))
+                lines.append(
+                    f'http_request_duration_seconds_bucket{labels(route=route, method=method, le=le)} {cumulative}'
+                )
+            lines.append(f'http_request_duration_seconds_sum{labels(route=route, method=method)} {histogram[-1]!r}')
+            lines.append(f'http_request_duration_seconds_count{labels(route=route, method=method)} {cumulative}')
+
+        lines += [
+            '# HELP db_queries_total SQL queries run while serving requests, by route.',
+            '# TYPE db_queries_total counter',
+        ]
+        lines += [f'db_queries_total{labels(route=route)} {count}' for route, (count, _) in sorted(queries.items())]
+        lines += [
+            '# HELP db_query_duration_seconds_total Time spent in SQL queries while serving requests, by route.',
+            '# TYPE db_query_duration_seconds_total counter',
+        ]
+        lines += [
+            f'db_query_duration_seconds_total{labels(route=route)} {seconds!r}'
+            for route, (_, seconds) in sorted(queries.items())
+        ]
+        lines += [
+            '# HELP response_cache_requests_total Cacheable reads by route and whether the response cache had them.',
+            '# TYPE response_cache_requests_total counter',
+        ]
+        lines += [
+            f'response_cache_requests_total{labels(route=route, result=result)} {count}'
+            for (route, result), count in sorted(cache.items())
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+LABEL_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n'})
+
+
+def labels(**values):
+    return '{' + ','.join(f'{name}="{str(value).translate(LABEL_ESCAPES)}"' for name, value in values.items()) + '}'
+
+
+request_metrics = RequestMetrics(getattr(settings, 'METRICS_BUCKETS', DEFAULT_BUCKETS))
+
+
+class MetricsMiddleware:
+    """
+    Feed request_metrics: latency, status, in-flight count, the SQL counted
+    by QueryBudgetMiddleware's recorder and the X-Cache result, per route.
+
+    Routes are labelled with their URL name (e.g. "sale-get-total-revenue"),
+    which keeps the label set bounded. Disabled by METRICS_ENABLED = False.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request_metrics.started()
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self.get_response(request)
+            return response
+        finally:
+            self.record(request, response, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        request_metrics.started()
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await self.get_response(request)
+            return response
+        finally:
+            self.record(request, response, time.perf_counter() - start)
+
+    def record(self, request, response, seconds):
+        match = getattr(request, 'resolver_match', None)
+        cache = response.get('X-Cache', '').lower() if response is not None else ''
+        request_metrics.finished(
+            match.view_name if match and match.view_name else UNMATCHED,
+            request.method,
+            response.status_code if response is not None else 500,
+            seconds,
+            getattr(request, 'query_recorder', None),
+            cache if cache in ('hit', 'miss') else None,
+        )
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:27
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+COUNTED_MODELS = {
+    "Sale": "total_sales",
+    "Medicine": "total_medicines",
+    "Appointment": "total_appointments",
+    "Contact": "total_contacts",
+    "Animal": "total_patients",
+    "CustomUser": "total_users",
+}
+
+
+def seed_counters(apps, schema_editor):
+    DashboardCounter = apps.get_model("veterinary", "DashboardCounter")
+    counters = [
+        DashboardCounter(key=key, value=apps.get_model("veterinary", model).objects.count())
+        for model, key in COUNTED_MODELS.items()
+    ]
+    revenue = apps.get_model("veterinary", "Sale").objects.aggregate(total=Sum("total_price"))["total"]
+    counters.append(DashboardCounter(key="total_revenue", value=revenue or 0))
+    DashboardCounter.objects.bulk_create(counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("veterinary", "0004_rename_name_contact_subject"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DashboardCounter",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                (
+                    "value",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=20),
+                ),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
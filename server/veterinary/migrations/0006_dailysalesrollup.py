@@ -0,0 +1,74 @@
+# Generated by Django 5.1.3 on 2026-10-18 08:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    Sale = apps.get_model("veterinary", "Sale")
+    DailySalesRollup = apps.get_model("veterinary", "DailySalesRollup")
+    rows = (
+        Sale.objects.annotate(day=TruncDate("sale_date"))
+        .values("day", "medicine_id")
+        .annotate(units=Sum("quantity_sold"), revenue=Sum("total_price"), sale_count=Count("id"))
+        .order_by()
+    )
+    DailySalesRollup.objects.bulk_create(
+        DailySalesRollup(
+            day=row["day"],
+            medicine_id=row["medicine_id"],
+            units=row["units"],
+            revenue=row["revenue"] or 0,
+            sale_count=row["sale_count"],
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("veterinary", "0005_dashboardcounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySalesRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("units", models.BigIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("sale_count", models.IntegerField(default=0)),
+                (
+                    "medicine",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_sales",
+                        to="veterinary.medicine",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "medicine"), name="unique_daily_sales_rollup"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("veterinary", "0006_dailysalesrollup"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="animal",
+            index=models.Index(fields=["status"], name="animal_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="animaldiagnosis",
+            index=models.Index(
+                condition=models.Q(("next_checkup__isnull", False)),
+                fields=["next_checkup"],
+                name="diagnosis_next_checkup_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(
+                fields=["date", "time"], name="appointment_date_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="medicine",
+            index=models.Index(
+                condition=models.Q(("quantity__lt", 5)),
+                fields=["quantity"],
+                name="medicine_low_stock_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sale",
+            index=models.Index(fields=["sale_date"], name="sale_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="sale",
+            index=models.Index(
+                fields=["medicine", "sale_date"], name="sale_medicine_date_idx"
+            ),
+        ),
+    ]
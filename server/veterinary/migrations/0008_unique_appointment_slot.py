@@ -0,0 +1,65 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:40
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# How many double-booked slots the error lists
+REPORTED_SLOTS = 20
+
+
+def check_no_double_bookings(apps, schema_editor):
+    """
+    Stop before adding the constraint if any slot is booked more than once.
+
+    Which booking should keep the slot is for the clinic to decide, so they
+    are listed rather than deleted or moved.
+    """
+    Appointment = apps.get_model("veterinary", "Appointment")
+    clashes = list(
+        Appointment.objects.using(schema_editor.connection.alias)
+        .values("date", "time")
+        .annotate(bookings=Count("id"))
+        .filter(bookings__gt=1)
+        .order_by("date", "time")
+    )
+    if not clashes:
+        return
+    slots = "\n".join(
+        f"  {clash['date']} {clash['time']}: appointment ids "
+        + ", ".join(
+            str(pk)
+            for pk in Appointment.objects.using(schema_editor.connection.alias)
+            .filter(date=clash["date"], time=clash["time"])
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        for clash in clashes[:REPORTED_SLOTS]
+    )
+    more = f"\n  ... and {len(clashes) - REPORTED_SLOTS} more" if len(clashes) > REPORTED_SLOTS else ""
+    raise RuntimeError(
+        f"{len(clashes)} appointment slot(s) are booked more than once, so the unique "
+        f"(date, time) constraint cannot be added. Move or delete the extra bookings "
+        f"and run migrate again:\n{slots}{more}"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("veterinary", "0007_hot_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_no_double_bookings, migrations.RunPython.noop),
+        # The constraint's unique index serves the same lookups
+        migrations.RemoveIndex(
+            model_name="appointment",
+            name="appointment_date_time_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="appointment",
+            constraint=models.UniqueConstraint(
+                fields=("date", "time"), name="unique_appointment_slot"
+            ),
+        ),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:52
+
+from django.db import migrations
+
+# Full-text indexes over patients and diagnoses. SQLite gets FTS5 tables kept
+# in sync by triggers; PostgreSQL gets GIN indexes on the same tsvector
+# expressions that veterinary.search queries. Other backends are skipped and
+# fall back to unindexed LIKE matching.
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE veterinary_animal_fts USING fts5(
+        owner_name, species, owner_contact,
+        content='veterinary_animal', content_rowid='animal_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER veterinary_animal_fts_insert AFTER INSERT ON veterinary_animal BEGIN
+        INSERT INTO veterinary_animal_fts(rowid, owner_name, species, owner_contact)
+        VALUES (new.animal_id, new.owner_name, new.species, new.owner_contact);
+    END
+    """,
+    """
+    CREATE TRIGGER veterinary_animal_fts_delete AFTER DELETE ON veterinary_animal BEGIN
+        INSERT INTO veterinary_animal_fts(veterinary_animal_fts, rowid, owner_name, species, owner_contact)
+        VALUES ('delete', old.animal_id, old.owner_name, old.species, old.owner_contact);
+    END
+    """,
+    """
+    CREATE TRIGGER veterinary_animal_fts_update AFTER UPDATE ON veterinary_animal BEGIN
+        INSERT INTO veterinary_animal_fts(veterinary_animal_fts, rowid, owner_name, species, owner_contact)
+        VALUES ('delete', old.animal_id, old.owner_name, old.species, old.owner_contact);
+        INSERT INTO veterinary_animal_fts(rowid, owner_name, species, owner_contact)
+        VALUES (new.animal_id, new.owner_name, new.species, new.owner_contact);
+    END
+    """,
+    "INSERT INTO veterinary_animal_fts(veterinary_animal_fts) VALUES ('rebuild')",
+    """
+    CREATE VIRTUAL TABLE veterinary_diagnosis_fts USING fts5(
+        diagnosis, prescribed_medicine,
+        content='veterinary_animaldiagnosis', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER veterinary_diagnosis_fts_insert AFTER INSERT ON veterinary_animaldiagnosis BEGIN
+        INSERT INTO veterinary_diagnosis_fts(rowid, diagnosis, prescribed_medicine)
+        VALUES (new.id, new.diagnosis, new.prescribed_medicine);
+    END
+    """,
+    """
+    CREATE TRIGGER veterinary_diagnosis_fts_delete AFTER DELETE ON veterinary_animaldiagnosis BEGIN
+        INSERT INTO veterinary_diagnosis_fts(veterinary_diagnosis_fts, rowid, diagnosis, prescribed_medicine)
+        VALUES ('delete', old.id, old.diagnosis, old.prescribed_medicine);
+    END
+    """,
+    """
+    CREATE TRIGGER veterinary_diagnosis_fts_update AFTER UPDATE ON veterinary_animaldiagnosis BEGIN
+        INSERT INTO veterinary_diagnosis_fts(veterinary_diagnosis_fts, rowid, diagnosis, prescribed_medicine)
+        VALUES ('delete', old.id, old.diagnosis, old.prescribed_medicine);
+        INSERT INTO veterinary_diagnosis_fts(rowid, diagnosis, prescribed_medicine)
+        VALUES (new.id, new.diagnosis, new.prescribed_medicine);
+    END
+    """,
+    "INSERT INTO veterinary_diagnosis_fts(veterinary_diagnosis_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS veterinary_animal_fts_insert",
+    "DROP TRIGGER IF EXISTS veterinary_animal_fts_delete",
+    "DROP TRIGGER IF EXISTS veterinary_animal_fts_update",
+    "DROP TABLE IF EXISTS veterinary_animal_fts",
+    "DROP TRIGGER IF EXISTS veterinary_diagnosis_fts_insert",
+    "DROP TRIGGER IF EXISTS veterinary_diagnosis_fts_delete",
+    "DROP TRIGGER IF EXISTS veterinary_diagnosis_fts_update",
+    "DROP TABLE IF EXISTS veterinary_diagnosis_fts",
+]
+
+# Must match ANIMAL_VECTOR / DIAGNOSIS_VECTOR in veterinary.search exactly,
+# otherwise the planner cannot use the indexes.
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX veterinary_animal_search_idx ON veterinary_animal USING GIN (
+        to_tsvector('simple', owner_name || ' ' || species || ' ' || owner_contact)
+    )
+    """,
+    """
+    CREATE INDEX veterinary_diagnosis_search_idx ON veterinary_animaldiagnosis USING GIN (
+        to_tsvector('english', diagnosis || ' ' || prescribed_medicine)
+    )
+    """,
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS veterinary_animal_search_idx",
+    "DROP INDEX IF EXISTS veterinary_diagnosis_search_idx",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("veterinary", "0008_unique_appointment_slot"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            run_for_vendor({"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE}),
+        ),
+    ]
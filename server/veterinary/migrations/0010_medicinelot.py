@@ -0,0 +1,73 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def open_lots_for_existing_stock(apps, schema_editor):
+    Medicine = apps.get_model("veterinary", "Medicine")
+    MedicineLot = apps.get_model("veterinary", "MedicineLot")
+    MedicineLot.objects.bulk_create(
+        MedicineLot(
+            medicine_id=medicine.pk,
+            lot_number="opening-stock",
+            quantity=medicine.quantity,
+            expiry_date=medicine.expiry_date,
+        )
+        for medicine in Medicine.objects.filter(quantity__gt=0).iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("veterinary", "0009_full_text_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MedicineLot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("lot_number", models.CharField(blank=True, max_length=50)),
+                ("quantity", models.PositiveIntegerField()),
+                ("expiry_date", models.DateField()),
+                (
+                    "received_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "medicine",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lots",
+                        to="veterinary.medicine",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("quantity__gt", 0)),
+                        fields=["expiry_date"],
+                        name="lot_in_stock_expiry_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(("quantity__gt", 0)),
+                        fields=["medicine", "expiry_date"],
+                        name="lot_medicine_expiry_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(open_lots_for_existing_stock, migrations.RunPython.noop),
+    ]
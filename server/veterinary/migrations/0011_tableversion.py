@@ -0,0 +1,36 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+VERSIONED_MODELS = [
+    "contact", "animal", "animaldiagnosis", "appointment", "medicine", "medicinelot", "sale", "customuser",
+]
+
+
+def seed_versions(apps, schema_editor):
+    TableVersion = apps.get_model("veterinary", "TableVersion")
+    now = django.utils.timezone.now()
+    TableVersion.objects.bulk_create(
+        TableVersion(key=f"veterinary.{model}", version=1, updated_at=now) for model in VERSIONED_MODELS
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('veterinary', '0010_medicinelot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(seed_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def enable_wal(apps, schema_editor):
+    # Readers and the writer stop blocking each other. The journal mode is
+    # stored in the database file, so it is set once here rather than on
+    # every connection.
+    if schema_editor.connection.vendor == "sqlite":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode = wal")
+
+
+class Migration(migrations.Migration):
+
+    # SQLite cannot change the journal mode inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("veterinary", "0011_tableversion"),
+    ]
+
+    operations = [
+        migrations.RunPython(enable_wal, migrations.RunPython.noop),
+    ]
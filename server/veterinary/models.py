@@ -1,5 +1,9 @@
+from collections import defaultdict
+from decimal import Decimal
+
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 
@@ -66,6 +70,11 @@ class Animal(models.Model):
     species = models.CharField(max_length=50)  # e.g., Dog, Cat, Horse
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="admitted")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='animal_status_idx'),
+        ]
+
     def __str__(self):
         return f"{self.species} ({self.status})"
 
@@ -78,6 +87,15 @@ class AnimalDiagnosis(models.Model):
     dosage = models.CharField(max_length=50)
     next_checkup = models.DateField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Most diagnoses have no follow-up, so only index the ones that do
+            models.Index(
+                fields=['next_checkup'], name='diagnosis_next_checkup_idx',
+                condition=models.Q(next_checkup__isnull=False),
+            ),
+        ]
+
     def __str__(self):
         return f"Diagnosis for {self.animal.name}"
 
@@ -89,9 +107,20 @@ class Appointment(models.Model):
     date = models.DateField()
     time = models.TimeField()
 
+    class Meta:
+        constraints = [
+            # One booking per slot; enforced by the database so concurrent bookings cannot both win.
+            # Its unique index also serves the date/time lookups, so there is no separate index.
+            models.UniqueConstraint(fields=['date', 'time'], name='unique_appointment_slot'),
+        ]
+
     def __str__(self):
         return f"Appointment for {self.animal.name} on {self.date}"
 
+# Medicines with fewer units than this are reported as low stock
+LOW_STOCK_THRESHOLD = 5
+
+
 class Medicine(models.Model):
     CATEGORY_CHOICES = [
         ('antibiotic', 'Antibiotic'),
@@ -106,6 +135,15 @@ class Medicine(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     expiry_date = models.DateField()
 
+    class Meta:
+        indexes = [
+            # Partial index: only the handful of low-stock rows are indexed
+            models.Index(
+                fields=['quantity'], name='medicine_low_stock_idx',
+                condition=models.Q(quantity__lt=LOW_STOCK_THRESHOLD),
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.get_category_display()}"
 
@@ -114,90 +152,201 @@ class Medicine(models.Model):
 
 
 
+# A delivery of a medicine with its own expiry; stock is sold first-expired-first-out
+class MedicineLot(models.Model):
+    medicine = models.ForeignKey(Medicine, on_delete=models.CASCADE, related_name="lots")
+    lot_number = models.CharField(max_length=50, blank=True)
+    quantity = models.PositiveIntegerField()
+    expiry_date = models.DateField()
+    received_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Only lots with stock left are ever allocated from or reported as expiring
+            models.Index(
+                fields=['expiry_date'], name='lot_in_stock_expiry_idx',
+                condition=models.Q(quantity__gt=0),
+            ),
+            models.Index(
+                fields=['medicine', 'expiry_date'], name='lot_medicine_expiry_idx',
+                condition=models.Q(quantity__gt=0),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.medicine.name} lot {self.lot_number or self.pk} ({self.quantity}, expires {self.expiry_date})"
+
+
 class Sale(models.Model):
     medicine = models.ForeignKey(Medicine, on_delete=models.CASCADE, related_name="sales")
     quantity_sold = models.PositiveIntegerField(validators=[MinValueValidator(1)])
     total_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     sale_date = models.DateTimeField(default=timezone.now)
-    
-from rest_framework.decorators import api_view
-from rest_framework.response import Response
-from rest_framework import status
-from django.db import transaction
-from .serializers import SaleSerializer
-from django.http import JsonResponse
-
-@api_view(['POST'])
-def create_sale(request):
-    try:
-        with transaction.atomic():
-            sale_serializer = SaleSerializer(data=request.data)
-            if sale_serializer.is_valid():
-                medicine_id = request.data.get('medicine')
-                quantity_sold = int(request.data.get('quantity_sold', 0))
-
-                medicine = Medicine.objects.get(id=medicine_id)
-
-                if medicine.quantity < quantity_sold:
-                    return Response({"error": "Not enough stock"}, status=status.HTTP_400_BAD_REQUEST)
-
-                total_price = quantity_sold * medicine.price  # Calculate total price
 
-                # Deduct stock
-                medicine.quantity -= quantity_sold
-                medicine.save(update_fields=["quantity"])
+    class Meta:
+        indexes = [
+            models.Index(fields=['sale_date'], name='sale_date_idx'),
+            models.Index(fields=['medicine', 'sale_date'], name='sale_medicine_date_idx'),
+        ]
 
-                # Save sale with total price
-                sale = sale_serializer.save(total_price=total_price)
+    def __str__(self):
+        return f"Sale of {self.quantity_sold} {self.medicine.name} on {self.sale_date}"
 
-                return Response(SaleSerializer(sale).data, status=status.HTTP_201_CREATED)
-            
-            return Response(sale_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    except Exception as e:
-        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    
-    def save(self, *args, **kwargs):
-        """Automatically calculate total price & update medicine stock."""
-        if self.medicine and self.quantity_sold:
-            self.total_price = self.quantity_sold * self.medicine.price  # Calculate total price
-
-            # Check if enough stock is available before modifying
-            if self.medicine.quantity < self.quantity_sold:
-                raise ValueError("Not enough stock available")
-
-            # Deduct stock
-            self.medicine.quantity -= self.quantity_sold
-            self.medicine.save(update_fields=["quantity"])  # Save only the quantity field
-        
-        super().save(*args, **kwargs)  # Save the sale record
+class DailySalesRollupManager(models.Manager):
+    def apply(self, sales, sign=1):
+        """
+        Add (sign=1) or remove (sign=-1) sales from their day/medicine rows.
+
+        Call inside the transaction that writes the sales so the rollup can
+        never disagree with the Sale table.
+        """
+        deltas = defaultdict(lambda: [0, Decimal(0), 0])
+        for sale in sales:
+            day = timezone.localdate(sale.sale_date) if timezone.is_aware(sale.sale_date) else sale.sale_date.date()
+            delta = deltas[(day, sale.medicine_id)]
+            delta[0] += sign * sale.quantity_sold
+            delta[1] += sign * (sale.total_price or Decimal(0))
+            delta[2] += sign
+
+        for (day, medicine_id), (units, revenue, count) in deltas.items():
+            changes = {
+                'units': models.F('units') + units,
+                'revenue': models.F('revenue') + revenue,
+                'sale_count': models.F('sale_count') + count,
+            }
+            if self.filter(day=day, medicine_id=medicine_id).update(**changes) or sign < 0:
+                # Nothing to take away from a row that does not exist (e.g. its
+                # medicine is being deleted along with its sales).
+                continue
+            try:
+                with transaction.atomic():
+                    self.create(day=day, medicine_id=medicine_id, units=units, revenue=revenue, sale_count=count)
+            except IntegrityError:
+                self.filter(day=day, medicine_id=medicine_id).update(**changes)
+
+
+    def rebuild(self, batch_size=1000):
+        """Recompute every row from the Sale table, e.g. after a bulk data fix."""
+        rows = (
+            Sale.objects.annotate(day=TruncDate('sale_date'))
+            .values('day', 'medicine_id')
+            .annotate(
+                units=models.Sum('quantity_sold'),
+                revenue=models.Sum('total_price'),
+                sale_count=models.Count('id'),
+            )
+            .order_by()
+        )
+        with transaction.atomic():
+            self.all().delete()
+            created = self.bulk_create(
+                (
+                    self.model(
+                        day=row['day'], medicine_id=row['medicine_id'], units=row['units'],
+                        revenue=row['revenue'] or 0, sale_count=row['sale_count'],
+                    )
+                    for row in rows.iterator()
+                ),
+                batch_size=batch_size,
+            )
+        return len(created)
+
+
+# Units and revenue per medicine per day, maintained alongside every Sale write
+class DailySalesRollup(models.Model):
+    day = models.DateField()
+    medicine = models.ForeignKey(Medicine, on_delete=models.CASCADE, related_name="daily_sales")
+    units = models.BigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    sale_count = models.IntegerField(default=0)
+
+    objects = DailySalesRollupManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'medicine'], name='unique_daily_sales_rollup'),
+        ]
 
     def __str__(self):
-        return f"Sale of {self.quantity_sold} {self.medicine.name} on {self.sale_date}"
+        return f"{self.medicine_id} on {self.day}: {self.units} units, {self.revenue}"
 
 
-def get_total_revenue(request):
-    total_revenue = Sale.objects.aggregate(sum('price'))['total_price__sum'] or 0
-    return JsonResponse({'total_revenue': total_revenue})
+class DashboardCounterManager(models.Manager):
+    def increment(self, key, delta=1):
+        """Atomically add delta to a counter, creating the row on first use."""
+        if self.filter(key=key).update(value=models.F('value') + delta):
+            return
+        try:
+            with transaction.atomic():
+                self.create(key=key, value=delta)
+        except IntegrityError:
+            # Another writer created the row first; fall back to the update.
+            self.filter(key=key).update(value=models.F('value') + delta)
 
-def get_medicine_count():
-    count=Medicine.objects.count()
-    return Response({"total_medicines": count})
+    def snapshot(self):
+        """Return every counter as a {key: value} dict in a single query."""
+        return dict(self.values_list('key', 'value'))
 
-def get_appointment_count():
-    count=Appointment.objects.count()
-    return Response({"total_appointments": count})
 
-def get_contact_count():
-    count=Contact.objects.count()
-    return Response({"total_contacts": count})
+# Running totals for the admin dashboard, kept current by veterinary.signals
+class DashboardCounter(models.Model):
+    key = models.CharField(max_length=50, primary_key=True)
+    value = models.DecimalField(max_digits=20, decimal_places=2, default=0)
 
-def get_patient_count():
-    count=Animal.objects.count()
-    return Response({"total_patients": count})
+    objects = DashboardCounterManager()
 
-def get_user_count():
-    count=CustomUser.objects.count()
-    return Response({"total_users": count})
-    
\ No newline at end of file
+    def __str__(self):
+        return f"{self.key}: {self.value}"
+
+
+class TableVersionManager(models.Manager):
+    def bump(self, *models_changed):
+        """Mark tables as changed; call inside the transaction that writes them."""
+        labels = {model._meta.label_lower for model in models_changed}
+        now = timezone.now()
+        updated = self.filter(key__in=labels).update(version=models.F('version') + 1, updated_at=now)
+        if updated == len(labels):
+            return
+        for label in labels - set(self.filter(key__in=labels).values_list('key', flat=True)):
+            try:
+                with transaction.atomic():
+                    self.create(key=label, version=1, updated_at=now)
+            except IntegrityError:
+                # Another writer created the row first; fall back to the update.
+                self.filter(key=label).update(version=models.F('version') + 1, updated_at=now)
+
+    def stamp(self, *models_read):
+        """
+        Return ({label: (version, updated_at)}, latest updated_at) for the given tables in one query.
+
+        The timestamp is part of each stamp so a table rolled back to an
+        earlier version number (a restored backup, a test transaction) is not
+        mistaken for the state that number described before.
+        """
+        return self._stamps(list(self._stamp_rows(models_read)))
+
+    async def astamp(self, *models_read):
+        return self._stamps([row async for row in self._stamp_rows(models_read)])
+
+    def _stamp_rows(self, models_read):
+        return self.filter(key__in={model._meta.label_lower for model in models_read}).values_list(
+            'key', 'version', 'updated_at'
+        )
+
+    def _stamps(self, rows):
+        stamps = {key: (version, updated_at.isoformat()) for key, version, updated_at in rows}
+        return stamps, max((updated_at for _, _, updated_at in rows), default=None)
+
+
+# A counter per table, bumped by veterinary.signals on every write, so readers
+# can tell whether anything changed without touching the table itself
+class TableVersion(models.Model):
+    key = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    objects = TableVersionManager()
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
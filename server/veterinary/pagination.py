@@ -0,0 +1,94 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Opaque-cursor pagination keyed on the primary key.
+
+    Each page is a `WHERE pk > <cursor> ORDER BY pk LIMIT n` range scan, so the
+    cost of a page does not grow with how deep into the table it is.
+    """
+    ordering = 'pk'
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 500)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        window = self.page_window(queryset, request, view)
+        if window is None:
+            return None
+        return self.set_page(list(window))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views: the page is read with the async ORM."""
+        window = self.page_window(queryset, request, view)
+        if window is None:
+            return None
+        return self.set_page([obj async for obj in window])
+
+    # CursorPagination.paginate_queryset, split around the one query it runs
+
+    def page_window(self, queryset, request, view=None):
+        """The page plus one row beyond it, as a lazy queryset."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            order = self.ordering[0]
+            is_reversed = order.startswith('-')
+            order_attr = order.lstrip('-')
+            if self.cursor.reverse != is_reversed:
+                queryset = queryset.filter(**{order_attr + '__lt': current_position})
+            else:
+                queryset = queryset.filter(**{order_attr + '__gt': current_position})
+
+        self.offset, self.reverse, self.current_position = offset, reverse, current_position
+        return queryset[offset:offset + self.page_size + 1]
+
+    def set_page(self, results):
+        """Work out the page and its neighbours' cursors from the rows page_window returned."""
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if self.reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (self.current_position is not None) or (self.offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = self.current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (self.current_position is not None) or (self.offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = self.current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
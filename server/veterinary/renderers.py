@@ -0,0 +1,73 @@
+import codecs
+from decimal import Decimal
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:  # optional; MessagePackRenderer is only enabled when it is installed
+    msgpack = None
+
+# Datetimes are handed to DRF's encoder so they read exactly as before ("...Z")
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+DRF_ENCODER = JSONEncoder()
+
+
+def encode_default(obj):
+    """What orjson/msgpack cannot encode (Decimal, dates, lazy strings, querysets) goes through DRF's rules."""
+    if isinstance(obj, Decimal):
+        # The common case (e.g. stock_value), without the isinstance chain
+        return float(obj)
+    return DRF_ENCODER.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer on orjson, producing the same document several times faster.
+
+    Decimals still become numbers and datetimes ISO strings as with DRF's
+    encoder. Indented output (the browsable API, `; indent=` in Accept) is
+    left to JSONRenderer, since orjson only indents by two spaces.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+        # Same escaping as JSONRenderer, so the output is safe inside <script>
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser on orjson. Bodies in another charset than UTF-8 fall back to JSONParser."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackRenderer(BaseRenderer):
+    """application/msgpack for clients that send it in Accept; needs the optional `msgpack` package."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, datetime=False)
@@ -0,0 +1,193 @@
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.db import connection, transaction
+from django.db.models import Case, F, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Least
+
+from .models import Medicine, MedicineLot, Sale, TableVersion
+from .signals import bulk_created, stock_decremented
+
+
+class InsufficientStock(Exception):
+    """Raised when a sale asks for more units than the medicine has in stock."""
+
+    def __init__(self, message="Not enough stock available", shortages=()):
+        super().__init__(message)
+        self.shortages = list(shortages)
+
+
+def record_sale(medicine, quantity_sold, **sale_fields):
+    """
+    Decrement stock and insert the sale in one transaction.
+
+    The stock check and the decrement are a single conditional UPDATE
+    (`quantity = quantity - n WHERE quantity >= n`), so concurrent sales can
+    neither oversell nor overwrite each other's decrement, and no row lock is
+    held while Python code runs.
+    """
+    with transaction.atomic():
+        decremented = Medicine.objects.filter(pk=medicine.pk, quantity__gte=quantity_sold).update(
+            quantity=F('quantity') - quantity_sold
+        )
+        if not decremented:
+            raise InsufficientStock()
+        allocate_fefo({medicine.pk: quantity_sold})
+        stock_decremented.send(sender=Medicine, quantities={medicine.pk: quantity_sold})
+
+        return Sale.objects.create(
+            medicine=medicine,
+            quantity_sold=quantity_sold,
+            total_price=quantity_sold * medicine.price,
+            **sale_fields,
+        )
+
+
+def checkout(lines, **sale_fields):
+    """
+    Sell several medicines as one all-or-nothing transaction.
+
+    `lines` is an iterable of (medicine_id, quantity) pairs; repeated medicines
+    are merged. Stock for every line is read in one query and decremented in
+    one set-based UPDATE guarded by `quantity >= n` per row, and the Sale rows
+    are written with a single bulk_create. If any line is short the whole
+    checkout is rolled back and InsufficientStock lists the short lines.
+
+    On backends with row locks the medicines are read FOR UPDATE in pk
+    order, so the shortages reported are exact and concurrent checkouts
+    over the same medicines queue instead of deadlocking. SQLite ignores
+    the lock; its IMMEDIATE transactions already keep other writers out.
+    """
+    wanted = Counter()
+    for medicine_id, quantity in lines:
+        wanted[medicine_id] += quantity
+
+    with transaction.atomic():
+        medicines = Medicine.objects.select_for_update().order_by('pk').in_bulk(wanted.keys())
+        missing = sorted(set(wanted) - set(medicines))
+        if missing:
+            raise Medicine.DoesNotExist(f"Medicine not found: {', '.join(map(str, missing))}")
+
+        shortages = [
+            {"medicine": pk, "requested": quantity, "available": medicines[pk].quantity}
+            for pk, quantity in wanted.items()
+            if medicines[pk].quantity < quantity
+        ]
+        if shortages:
+            raise InsufficientStock(shortages=shortages)
+
+        decremented = Medicine.objects.filter(
+            reduce(or_, (Q(pk=pk, quantity__gte=quantity) for pk, quantity in wanted.items()))
+        ).update(
+            quantity=Case(*(When(pk=pk, then=F('quantity') - quantity) for pk, quantity in wanted.items()))
+        )
+        if decremented != len(wanted):
+            # Stock moved between the read and the update; undo everything.
+            raise InsufficientStock()
+        allocate_fefo(wanted)
+        stock_decremented.send(sender=Medicine, quantities=dict(wanted))
+
+        sales = Sale.objects.bulk_create(
+            Sale(
+                medicine=medicines[pk],
+                quantity_sold=quantity,
+                total_price=quantity * medicines[pk].price,
+                **sale_fields,
+            )
+            for pk, quantity in wanted.items()
+        )
+        bulk_created.send(sender=Sale, instances=sales)
+        return sales
+
+
+# Takes `wanted` units per medicine from its lots, soonest expiry first. The
+# running total of each medicine's lots tells every lot how much of the demand
+# is already covered by earlier lots, so one UPDATE drains them in FEFO order.
+FEFO_ALLOCATION_SQL = """
+WITH wanted (medicine_id, units) AS (VALUES {values}),
+running AS (
+    SELECT lot.id, lot.quantity, wanted.units,
+           SUM(lot.quantity) OVER (
+               PARTITION BY lot.medicine_id ORDER BY lot.expiry_date, lot.id
+           ) - lot.quantity AS covered
+    FROM {lots} AS lot JOIN wanted ON wanted.medicine_id = lot.medicine_id
+    WHERE lot.quantity > 0
+)
+UPDATE {lots}
+SET quantity = {lots}.quantity - {least}(running.quantity, running.units - running.covered)
+FROM running
+WHERE {lots}.id = running.id AND running.covered < running.units
+"""
+
+
+def allocate_fefo(wanted):
+    """
+    Drain lots first-expired-first-out for {medicine_id: units} in one statement.
+
+    Must run in the transaction that decremented Medicine.quantity: that
+    update holds the medicine row, so concurrent allocations for the same
+    medicine queue behind it. Stock recorded without a lot (e.g. from before
+    lots existed) is simply not covered by any lot.
+    """
+    if not wanted:
+        return 0
+    sql = FEFO_ALLOCATION_SQL.format(
+        values=', '.join(['(%s, %s)'] * len(wanted)),
+        lots=connection.ops.quote_name(MedicineLot._meta.db_table),
+        least='LEAST' if connection.vendor == 'postgresql' else 'MIN',
+    )
+    params = [value for item in wanted.items() for value in item]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def restock(medicine, quantity, expiry_date, lot_number=''):
+    """
+    Receive a new lot; the medicine's total and soonest expiry follow it.
+
+    The medicine row is updated before the lot is written, so its lock is
+    taken first as in record_sale and checkout, and both tables' versions
+    are bumped in one statement at the end, as a sale bumps them. Taking
+    them in the opposite order let a restock and a sale deadlock.
+    """
+    with transaction.atomic():
+        soonest = MedicineLot.objects.filter(medicine=medicine, quantity__gt=0).order_by('expiry_date')
+        new_expiry = Value(expiry_date)
+        Medicine.objects.filter(pk=medicine.pk).update(
+            quantity=F('quantity') + quantity,
+            expiry_date=Least(Coalesce(Subquery(soonest.values('expiry_date')[:1]), new_expiry), new_expiry),
+        )
+        lot = MedicineLot(medicine=medicine, quantity=quantity, expiry_date=expiry_date, lot_number=lot_number)
+        # bulk_create skips post_save, whose version bump would come too early
+        MedicineLot.objects.bulk_create([lot])
+        TableVersion.objects.bump(Medicine, MedicineLot)
+        return lot
+
+
+def reconcile_lots(medicine, previous_quantity):
+    """Mirror a direct edit of Medicine.quantity in the lots: add a lot or write stock off FEFO."""
+    reconcile_lots_in_bulk([medicine], {medicine.pk: previous_quantity})
+
+
+def reconcile_lots_in_bulk(medicines, previous_quantities):
+    """
+    reconcile_lots for many medicines at once, given {medicine_id: quantity before the edit}.
+
+    Medicines missing from `previous_quantities` are new and start from 0.
+    Increases become one bulk INSERT of opening lots, decreases one FEFO write-off.
+    """
+    added, written_off = [], {}
+    for medicine in medicines:
+        delta = medicine.quantity - previous_quantities.get(medicine.pk, 0)
+        if delta > 0:
+            added.append(MedicineLot(medicine=medicine, quantity=delta, expiry_date=medicine.expiry_date))
+        elif delta < 0:
+            written_off[medicine.pk] = -delta
+    if added:
+        MedicineLot.objects.bulk_create(added)
+        bulk_created.send(sender=MedicineLot, instances=added)
+    if written_off:
+        allocate_fefo(written_off)
+        stock_decremented.send(sender=Medicine, quantities=written_off)
@@ -0,0 +1,93 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import Appointment
+
+DEFAULT_CLINIC_HOURS = {
+    'open': '08:00',
+    'close': '17:00',
+    'slot_minutes': 30,
+    'days': [0, 1, 2, 3, 4, 5],  # Monday to Saturday
+}
+
+
+class SlotConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "This slot is already booked."
+    default_code = 'slot_conflict'
+
+
+def clinic_hours():
+    """CLINIC_HOURS from settings, with opening/closing times parsed."""
+    hours = {**DEFAULT_CLINIC_HOURS, **getattr(settings, 'CLINIC_HOURS', {})}
+    return {
+        'open': time.fromisoformat(hours['open']),
+        'close': time.fromisoformat(hours['close']),
+        'slot': timedelta(minutes=hours['slot_minutes']),
+        'days': set(hours['days']),
+    }
+
+
+def day_slots(day, hours):
+    """Every slot start time on `day`, or nothing if the clinic is closed."""
+    if day.weekday() not in hours['days']:
+        return []
+    slots = []
+    start = datetime.combine(day, hours['open'])
+    end = datetime.combine(day, hours['close'])
+    while start + hours['slot'] <= end:
+        slots.append(start.time())
+        start += hours['slot']
+    return slots
+
+
+def slot_containing(moment, hours):
+    """Start of the slot a time falls in, so off-grid bookings still block their slot."""
+    anchor = datetime(2000, 1, 3)
+    opening = datetime.combine(anchor, hours['open'])
+    offset = datetime.combine(anchor, moment) - opening
+    return (opening + (offset // hours['slot']) * hours['slot']).time()
+
+
+def slot_error(day, start):
+    """Why an appointment cannot start at `start` on `day`, or None if it is a bookable slot."""
+    hours = clinic_hours()
+    slots = day_slots(day, hours)
+    if not slots:
+        return "The clinic is closed on that day."
+    if start not in slots:
+        first, last = slots[0].strftime('%H:%M'), slots[-1].strftime('%H:%M')
+        minutes = int(hours['slot'].total_seconds() // 60)
+        return f"Appointments start every {minutes} minutes between {first} and {last}."
+    return None
+
+
+def free_slots(start, end):
+    """
+    Free slots per day between two dates, inclusive.
+
+    Bookings are read with one range query over the (date, time) index, so
+    the cost follows the size of the window rather than the appointment history.
+    """
+    hours = clinic_hours()
+    booked = defaultdict(set)
+    for day, booked_time in Appointment.objects.filter(date__range=(start, end)).values_list('date', 'time'):
+        booked[day].add(slot_containing(booked_time, hours))
+
+    now = timezone.localtime()
+    days = []
+    day = start
+    while day <= end:
+        slots = [slot for slot in day_slots(day, hours) if slot not in booked[day]]
+        if day == now.date():
+            slots = [slot for slot in slots if slot > now.time()]
+        elif day < now.date():
+            slots = []
+        days.append({'date': day, 'slots': [slot.strftime('%H:%M') for slot in slots]})
+        day += timedelta(days=1)
+    return days
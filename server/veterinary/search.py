@@ -0,0 +1,95 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Animal, AnimalDiagnosis
+
+KINDS = ('patient', 'diagnosis')
+
+# The same expressions are indexed by migration 0009 on PostgreSQL
+ANIMAL_VECTOR = "to_tsvector('simple', owner_name || ' ' || species || ' ' || owner_contact)"
+DIAGNOSIS_VECTOR = "to_tsvector('english', diagnosis || ' ' || prescribed_medicine)"
+
+SQLITE_QUERIES = {
+    'patient': (
+        "SELECT 'patient', rowid, -bm25(veterinary_animal_fts) FROM veterinary_animal_fts "
+        "WHERE veterinary_animal_fts MATCH %s"
+    ),
+    'diagnosis': (
+        "SELECT 'diagnosis', rowid, -bm25(veterinary_diagnosis_fts) FROM veterinary_diagnosis_fts "
+        "WHERE veterinary_diagnosis_fts MATCH %s"
+    ),
+}
+
+POSTGRES_QUERIES = {
+    'patient': (
+        f"SELECT 'patient', animal_id, ts_rank({ANIMAL_VECTOR}, to_tsquery('simple', %s)) "
+        f"FROM veterinary_animal WHERE {ANIMAL_VECTOR} @@ to_tsquery('simple', %s)"
+    ),
+    'diagnosis': (
+        f"SELECT 'diagnosis', id, ts_rank({DIAGNOSIS_VECTOR}, to_tsquery('english', %s)) "
+        f"FROM veterinary_animaldiagnosis WHERE {DIAGNOSIS_VECTOR} @@ to_tsquery('english', %s)"
+    ),
+}
+
+
+def terms(text):
+    """Split free text into plain words so user input can never be read as query syntax."""
+    return re.findall(r'\w+', text)
+
+
+def ranked_matches(text, kinds=KINDS, limit=20, offset=0):
+    """
+    Return [(kind, pk, score)] best match first, using the backend's full-text index.
+
+    Every word must match; the last one may be a prefix so search-as-you-type works.
+    """
+    words = terms(text)
+    if not words:
+        return []
+
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{word}"' for word in words) + '*'
+        parts, params = [SQLITE_QUERIES[kind] for kind in kinds], [match] * len(kinds)
+    elif connection.vendor == 'postgresql':
+        match = ' & '.join(words) + ':*'
+        parts, params = [POSTGRES_QUERIES[kind] for kind in kinds], [match, match] * len(kinds)
+    else:
+        return _unindexed_matches(words, kinds, limit, offset)
+
+    sql = ' UNION ALL '.join(parts) + ' ORDER BY 3 DESC, 1, 2 LIMIT %s OFFSET %s'
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [limit, offset])
+        return cursor.fetchall()
+
+
+def _unindexed_matches(words, kinds, limit, offset):
+    # Backends without a full-text index: substring matching, no ranking
+    matches = []
+    if 'patient' in kinds:
+        condition = Q()
+        for word in words:
+            condition &= Q(owner_name__icontains=word) | Q(species__icontains=word) | Q(owner_contact__icontains=word)
+        matches += [('patient', pk, 0.0) for pk in Animal.objects.filter(condition).values_list('pk', flat=True)]
+    if 'diagnosis' in kinds:
+        condition = Q()
+        for word in words:
+            condition &= Q(diagnosis__icontains=word) | Q(prescribed_medicine__icontains=word)
+        matches += [('diagnosis', pk, 0.0) for pk in AnimalDiagnosis.objects.filter(condition).values_list('pk', flat=True)]
+    return matches[offset:offset + limit]
+
+
+def search(text, kinds=KINDS, limit=20, offset=0):
+    """Ranked matches with their model instances attached, two queries for the rows at most."""
+    matches = ranked_matches(text, kinds, limit, offset)
+    ids = {kind: [pk for match_kind, pk, _ in matches if match_kind == kind] for kind in KINDS}
+    objects = {
+        'patient': Animal.objects.in_bulk(ids['patient']) if ids['patient'] else {},
+        'diagnosis': AnimalDiagnosis.objects.in_bulk(ids['diagnosis']) if ids['diagnosis'] else {},
+    }
+    return [
+        (kind, objects[kind][pk], score)
+        for kind, pk, score in matches
+        if pk in objects[kind]
+    ]
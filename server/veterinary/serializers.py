@@ -1,7 +1,13 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
 from django.contrib.auth import authenticate
 from rest_framework.authtoken.models import Token
-from .models import Contact, Animal, AnimalDiagnosis, Appointment, Medicine, Sale, CustomUser
+from .fieldsets import SparseFieldsMixin
+from .models import Contact, Animal, AnimalDiagnosis, Appointment, Medicine, MedicineLot, Sale, CustomUser
+from .scheduling import slot_error
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -45,62 +51,170 @@ class UserLoginSerializer(serializers.Serializer):
     
 
 # Contact Serializer
-class ContactSerializer(serializers.ModelSerializer):
+class ContactSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Contact
         fields = '__all__'
 
 
 # Animal (Patient) Serializer
-class AnimalSerializer(serializers.ModelSerializer):
+class AnimalSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Animal
         fields = '__all__'
 
 
 # Animal Diagnosis Serializer
-class AnimalDiagnosisSerializer(serializers.ModelSerializer):
+class AnimalDiagnosisSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = AnimalDiagnosis
         fields = '__all__'
+        expandable_fields = {'animal': AnimalSerializer}
 
 
 # Appointment Serializer
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Appointment
         fields = '__all__'
+        validators = [
+            UniqueTogetherValidator(
+                queryset=Appointment.objects.all(), fields=['date', 'time'], message="This slot is already booked."
+            ),
+        ]
+
+    def validate(self, data):
+        day = data.get('date', getattr(self.instance, 'date', None))
+        start = data.get('time', getattr(self.instance, 'time', None))
+        # Existing bookings keep their original time unless it is being moved
+        moved = self.instance is None or (day, start) != (self.instance.date, self.instance.time)
+        if moved:
+            error = slot_error(day, start)
+            if error:
+                raise serializers.ValidationError({'time': error})
+        return data
         
 
-class MedicineSerializer(serializers.ModelSerializer):
+class MedicineSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     stock_value = serializers.SerializerMethodField()  # Compute stock value dynamically
 
     class Meta:
         model = Medicine
         fields = '__all__'
+        field_sources = {'stock_value': ('quantity', 'price')}
 
     def get_stock_value(self, obj):
         """Calculate the total stock value of the medicine."""
         return obj.stock_value()
 
 
-class SaleSerializer(serializers.ModelSerializer):
+class MedicineLotSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    medicine_name = serializers.CharField(source='medicine.name', read_only=True)
+
+    class Meta:
+        model = MedicineLot
+        fields = ['id', 'medicine', 'medicine_name', 'lot_number', 'quantity', 'expiry_date', 'received_at']
+        read_only_fields = ['medicine', 'received_at']
+        extra_kwargs = {'quantity': {'min_value': 1}}
+        expandable_fields = {'medicine': MedicineSerializer}
+
+
+class MedicineImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Medicine
+        fields = ['name', 'category', 'quantity', 'price', 'expiry_date']
+        # Existing names are updated by the bulk upsert rather than rejected row by row
+        extra_kwargs = {'name': {'validators': []}}
+
+
+class SaleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     total_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
-    medicine_name = serializers.SerializerMethodField()
+    medicine_name = serializers.CharField(source='medicine.name', read_only=True)
 
     class Meta:
         model = Sale
         fields = ['id', 'total_price', 'quantity_sold', 'sale_date', 'medicine', 'medicine_name']
-
-    def get_medicine_name(self, obj):
-        return obj.medicine.name
+        expandable_fields = {'medicine': MedicineSerializer}
     
 
+class CheckoutLineSerializer(serializers.Serializer):
+    # Plain ids: the checkout looks every medicine up in one query
+    medicine = serializers.IntegerField(min_value=1)
+    quantity_sold = serializers.IntegerField(min_value=1)
+
+
+class CheckoutSerializer(serializers.Serializer):
+    items = CheckoutLineSerializer(many=True, allow_empty=False)
+
+
+class DateRangeQuerySerializer(serializers.Serializer):
+    """
+    Optional ?from=&to= dates. A missing end defaults to `default_days` from
+    the other: back from today, or forward from today when `forward` is set.
+    """
+    default_days = 30
+    forward = False
+    max_days = None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # "from" is a Python keyword, so the range fields are added by name here
+        fields['from'] = serializers.DateField(required=False)
+        fields['to'] = serializers.DateField(required=False)
+        return fields
+
+    def default_range(self, data):
+        today, span = timezone.localdate(), timedelta(days=self.default_days)
+        if self.forward:
+            data.setdefault('from', today)
+            data.setdefault('to', data['from'] + span)
+        else:
+            data.setdefault('to', today)
+            data.setdefault('from', data['to'] - span)
+
+    def validate(self, data):
+        self.default_range(data)
+        if data['from'] > data['to']:
+            raise serializers.ValidationError("'from' must not be after 'to'.")
+        if self.max_days is not None and (data['to'] - data['from']).days >= self.max_days:
+            raise serializers.ValidationError(f"The range cannot be longer than {self.max_days} days.")
+        return data
+
+
+class SalesTimeseriesQuerySerializer(DateRangeQuerySerializer):
+    bucket = serializers.ChoiceField(choices=['day', 'week', 'month'], default='day')
+    group_by = serializers.ChoiceField(choices=['medicine', 'category'], required=False)
+    medicine = serializers.IntegerField(min_value=1, required=False)
+    category = serializers.ChoiceField(choices=Medicine.CATEGORY_CHOICES, required=False)
+
+
+class AvailabilityQuerySerializer(DateRangeQuerySerializer):
+    # The next 7 days, both ends included
+    default_days = 6
+    forward = True
+    max_days = 62
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    type = serializers.ChoiceField(choices=['patient', 'diagnosis'], required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    offset = serializers.IntegerField(min_value=0, max_value=1000, default=0)
+
+
+class ExpiringQuerySerializer(serializers.Serializer):
+    within = serializers.RegexField(r'^\d{1,4}d?$', default='30d')
+    limit = serializers.IntegerField(min_value=1, max_value=500, default=100)
+
+    def validate_within(self, value):
+        return timedelta(days=int(value.rstrip('d')))
+
+
 class CountSerializer(serializers.Serializer):
     count = serializers.IntegerField()
     
 #custim user serializer
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser  # Change this from User to CustomUser
         fields = ['id', 'full_name', 'email']
\ No newline at end of file
@@ -0,0 +1,117 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .models import Contact, Animal, AnimalDiagnosis, Appointment, Medicine, MedicineLot, Sale, CustomUser, DashboardCounter, DailySalesRollup, TableVersion
+
+# Dashboard counter key for each model whose rows are counted
+COUNTED_MODELS = {
+    Sale: 'total_sales',
+    Medicine: 'total_medicines',
+    Appointment: 'total_appointments',
+    Contact: 'total_contacts',
+    Animal: 'total_patients',
+    CustomUser: 'total_users',
+}
+
+REVENUE_KEY = 'total_revenue'
+
+# Tables whose TableVersion is bumped on every write, for conditional GETs
+VERSIONED_MODELS = (Contact, Animal, AnimalDiagnosis, Appointment, Medicine, MedicineLot, Sale, CustomUser)
+
+# Sent with sender=<model class> and instances=<list> after a bulk_create,
+# which bypasses post_save, so derived data can be kept in step.
+bulk_created = Signal()
+
+# Sent with sender=Medicine and quantities={medicine_id: units} after stock is
+# taken with a queryset UPDATE, which bypasses post_save.
+stock_decremented = Signal()
+
+
+def rebuild_dashboard_counters():
+    """
+    Recompute every dashboard counter from its table.
+
+    The counters are kept current row by row below; this full recount is for
+    repairs and for loads that bypass the signals.
+    """
+    with transaction.atomic():
+        for model, key in COUNTED_MODELS.items():
+            DashboardCounter.objects.update_or_create(key=key, defaults={'value': model.objects.count()})
+        revenue = Sale.objects.aggregate(total=Sum('total_price'))['total'] or 0
+        DashboardCounter.objects.update_or_create(key=REVENUE_KEY, defaults={'value': revenue})
+
+
+def count_rows_created(sender, instance, created, **kwargs):
+    if created:
+        DashboardCounter.objects.increment(COUNTED_MODELS[sender], 1)
+
+
+def count_rows_deleted(sender, instance, **kwargs):
+    DashboardCounter.objects.increment(COUNTED_MODELS[sender], -1)
+
+
+def count_rows_bulk_created(sender, instances, **kwargs):
+    DashboardCounter.objects.increment(COUNTED_MODELS[sender], len(instances))
+
+
+for model, key in COUNTED_MODELS.items():
+    post_save.connect(count_rows_created, sender=model, dispatch_uid=f'count-created-{key}')
+    post_delete.connect(count_rows_deleted, sender=model, dispatch_uid=f'count-deleted-{key}')
+    bulk_created.connect(count_rows_bulk_created, sender=model, dispatch_uid=f'count-bulk-created-{key}')
+
+
+def bump_version(sender, **kwargs):
+    TableVersion.objects.bump(sender)
+
+
+for model in VERSIONED_MODELS:
+    label = model._meta.label_lower
+    post_save.connect(bump_version, sender=model, dispatch_uid=f'version-saved-{label}')
+    post_delete.connect(bump_version, sender=model, dispatch_uid=f'version-deleted-{label}')
+    bulk_created.connect(bump_version, sender=model, dispatch_uid=f'version-bulk-created-{label}')
+
+
+@receiver(stock_decremented, sender=Medicine)
+def bump_stock_versions(sender, quantities, **kwargs):
+    # Stock is taken from the medicine and its lots with queryset UPDATEs
+    TableVersion.objects.bump(Medicine, MedicineLot)
+
+
+@receiver(pre_save, sender=Sale)
+def remember_previous_sale(sender, instance, **kwargs):
+    """Keep the stored row around so an edited sale only adjusts the totals by the difference."""
+    instance._previous_sale = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_sale = Sale.objects.filter(pk=instance.pk).only(
+            'medicine_id', 'quantity_sold', 'total_price', 'sale_date'
+        ).first()
+
+
+@receiver(post_save, sender=Sale)
+def track_sale_totals_on_save(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_sale', None)
+    delta = (instance.total_price or Decimal(0)) - ((previous and previous.total_price) or Decimal(0))
+    if delta:
+        DashboardCounter.objects.increment(REVENUE_KEY, delta)
+    if previous:
+        DailySalesRollup.objects.apply([previous], sign=-1)
+    DailySalesRollup.objects.apply([instance])
+
+
+@receiver(post_delete, sender=Sale)
+def track_sale_totals_on_delete(sender, instance, **kwargs):
+    if instance.total_price:
+        DashboardCounter.objects.increment(REVENUE_KEY, -instance.total_price)
+    DailySalesRollup.objects.apply([instance], sign=-1)
+
+
+@receiver(bulk_created, sender=Sale)
+def track_sale_totals_on_bulk_create(sender, instances, **kwargs):
+    total = sum((sale.total_price or Decimal(0) for sale in instances), Decimal(0))
+    if total:
+        DashboardCounter.objects.increment(REVENUE_KEY, total)
+    DailySalesRollup.objects.apply(instances)
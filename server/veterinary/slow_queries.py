@@ -0,0 +1,158 @@
+import json
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .instrumentation import current_recorder
+
+logger = logging.getLogger(__name__)
+
+# Statements that are explained; EXPLAIN never runs them, but plans for
+# writes are rarely what made a read endpoint slow
+EXPLAINED_STATEMENTS = ('select', 'with')
+EXPLAIN_SAVEPOINT = 'slow_query_explain'
+
+
+def view_name(request):
+    """Name the view serving `request` like "SaleViewSet.get_total_revenue", or None."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    view_class = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    if view_class is None:
+        return match.func.__name__
+    method = request.method.lower()
+    actions = getattr(match.func, 'actions', None)
+    return f'{view_class.__name__}.{actions.get(method, method) if actions else method}'
+
+
+def explain(connection, sql, params):
+    """
+    The query plan for `sql`, one line per row of EXPLAIN (QUERY PLAN).
+
+    A raw backend cursor is used so the EXPLAIN skips the execute wrappers.
+    Inside a transaction it runs under a savepoint: a failed EXPLAIN would
+    otherwise abort the caller's transaction on PostgreSQL.
+    """
+    cursor = connection.create_cursor()
+    in_transaction = not connection.get_autocommit()
+    try:
+        if in_transaction:
+            cursor.execute(connection.ops.savepoint_create_sql(EXPLAIN_SAVEPOINT))
+        try:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            plan = [str(row[-1]) for row in cursor.fetchall()]
+        except connection.Database.Error as error:
+            if in_transaction:
+                cursor.execute(connection.ops.savepoint_rollback_sql(EXPLAIN_SAVEPOINT))
+            return [f'EXPLAIN failed: {error}']
+        if in_transaction:
+            cursor.execute(connection.ops.savepoint_commit_sql(EXPLAIN_SAVEPOINT))
+        return plan
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    """
+    Database execute wrapper that logs queries taking `threshold` seconds or more.
+
+    Each entry is one JSON object with the SQL, its parameters, the view
+    that ran it and its plan. A token bucket lets `rate` entries a second
+    through (bursts of `burst`). Once it is empty, slow queries are sampled
+    at random with probability `sample_rate`, so a sustained burst is still
+    represented throughout rather than only by its first queries. Sampled
+    entries say so, and every query left out is counted in the next
+    entry's "suppressed".
+    """
+
+    def __init__(self, threshold, rate=1.0, burst=10, sample_rate=0.01):
+        self.threshold = threshold
+        self.rate = rate
+        self.burst = burst
+        self.sample_rate = sample_rate
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - start
+        if duration >= self.threshold:
+            admitted = self.admit()
+            if admitted is not None:
+                self.log(context['connection'], sql, params, many, duration, *admitted)
+        return result
+
+    def admit(self):
+        """
+        (entries suppressed since the last one, whether this one was sampled)
+        if this entry may be logged, else None.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                sampled = False
+            elif random.random() < self.sample_rate:
+                sampled = True
+            else:
+                self._suppressed += 1
+                return None
+            suppressed, self._suppressed = self._suppressed, 0
+            return suppressed, sampled
+
+    def log(self, connection, sql, params, many, duration, suppressed, sampled):
+        recorder = current_recorder.get()
+        request = recorder.request if recorder is not None else None
+        explained = not many and sql.lstrip().lower().startswith(EXPLAINED_STATEMENTS)
+        entry = {
+            'event': 'slow_query',
+            'duration_ms': round(duration * 1000, 2),
+            'threshold_ms': round(self.threshold * 1000, 2),
+            'database': connection.alias,
+            'vendor': connection.vendor,
+            'sql': sql,
+            # executemany batches can be huge; their parameters are left out
+            'params': None if many else params,
+            'view': view_name(request) if request is not None else None,
+            'method': request.method if request is not None else None,
+            'path': request.path if request is not None else None,
+            'plan': explain(connection, sql, params) if explained else None,
+            'suppressed': suppressed,
+            # Over the rate limit: one of roughly 1 / sample_rate such queries
+            'sampled': sampled,
+            'sample_rate': self.sample_rate if sampled else None,
+        }
+        logger.warning(json.dumps(entry, default=str))
+
+
+def slow_query_log():
+    threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD', None)
+    if threshold is None:
+        return None
+    return SlowQueryLog(
+        threshold / 1000,
+        getattr(settings, 'SLOW_QUERY_LOG_RATE', 1.0),
+        getattr(settings, 'SLOW_QUERY_LOG_BURST', 10),
+        getattr(settings, 'SLOW_QUERY_SAMPLE_RATE', 0.01),
+    )
+
+
+# One log, and so one rate limit, for every connection in the process
+log_slow_query = slow_query_log()
+
+
+@receiver(connection_created, dispatch_uid='install-slow-query-log')
+def install_slow_query_log(sender, connection, **kwargs):
+    if log_slow_query is not None and log_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_query)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserRegistrationView, UserLoginView, ContactViewSet, AnimalViewSet, AnimalDiagnosisViewSet, AppointmentViewSet, MedicineViewSet, SaleViewSet, CustomUserViewSet
+from .views import UserRegistrationView, UserLoginView, ContactViewSet, AnimalViewSet, AnimalDiagnosisViewSet, AppointmentViewSet, MedicineViewSet, SaleViewSet, CustomUserViewSet, DashboardSummaryView, ResponseCacheStatsView, SearchView, event_stream
 
 # router and register viewsets
 router = DefaultRouter()
@@ -16,6 +16,10 @@ urlpatterns = [
     path('api/', include(router.urls)),
     path('register/', UserRegistrationView.as_view(), name='user-register'),
     path('login/', UserLoginView.as_view(), name='user-login'),
+    path('dashboard/summary/', DashboardSummaryView.as_view(), name='dashboard-summary'),
+    path('cache/stats/', ResponseCacheStatsView.as_view(), name='response-cache-stats'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('events/', event_stream, name='event-stream'),
     path('', include(router.urls)),  # Include router URLs for browsable API
 ]
 
@@ -25,4 +29,5 @@ urlpatterns = [
 # http://127.0.0.1:8000/api/medicine/count/
 # http://127.0.0.1:8000/api/appointments/count/
 # http://127.0.0.1:8000/api/contacts/count/
-# http://127.0.0.1:8000/api/patients/count/
\ No newline at end of file
+# http://127.0.0.1:8000/api/patients/count/
+# http://127.0.0.1:8000/api/dashboard/summary/  (all of the above in one response)
\ No newline at end of file
@@ -1,137 +1,435 @@
-from rest_framework import status, views, viewsets
-from rest_framework.response import Response
-from rest_framework.views import APIView
-from rest_framework.authtoken.models import Token
-from django.contrib.auth import login
+import asyncio
+from io import TextIOWrapper
 
-from django.db.models import Sum
-from .models import Contact, Animal, AnimalDiagnosis, Appointment, Medicine, Sale, CustomUser
-from .serializers import ContactSerializer, AnimalSerializer, AnimalDiagnosisSerializer, AppointmentSerializer, MedicineSerializer, SaleSerializer, UserRegistrationSerializer, UserLoginSerializer, UserSerializer
+from django.conf import settings
+from django.contrib.auth import login
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status, viewsets
+from rest_framework.authtoken.models import Token
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request as DRFRequest
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
-from rest_framework import generics
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+from .async_reads import AsyncReadMixin
+from .bulk_io import FORMATS, astream_rows, import_medicines, read_records, stream_rows
+from .conditional import ConditionalGetMixin, response_cache_stats, versioned
+from .events import format_sse, get_broker
+from .fieldsets import SparseFieldsViewMixin
+from .hashing import run_in_hashing_pool
+from .metrics import request_metrics
+from .models import Contact, Animal, AnimalDiagnosis, Appointment, Medicine, MedicineLot, Sale, CustomUser, DashboardCounter, DailySalesRollup, LOW_STOCK_THRESHOLD
+from .sales import InsufficientStock, checkout, reconcile_lots, record_sale, restock
+from .scheduling import SlotConflict, clinic_hours, free_slots
+from .search import KINDS, search
+from .serializers import ContactSerializer, AnimalSerializer, AnimalDiagnosisSerializer, AppointmentSerializer, MedicineSerializer, SaleSerializer, CheckoutSerializer, SalesTimeseriesQuerySerializer, AvailabilityQuerySerializer, SearchQuerySerializer, MedicineLotSerializer, ExpiringQuerySerializer, UserRegistrationSerializer, UserLoginSerializer, UserSerializer
+from .signals import COUNTED_MODELS, REVENUE_KEY
+
 
-class UserRegistrationView(APIView):
-    def post(self, request):
-        serializer = UserRegistrationSerializer(data=request.data)
+async def request_data(request):
+    """
+    Parse a plain Django request body the way DRF would for an APIView.
+
+    Raises DRF's APIException subclasses as an APIView would see them: a
+    malformed body is a ParseError (400), an unlisted Content-Type an
+    UnsupportedMediaType (415).
+    """
+    return DRFRequest(request, parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES]).data
+
+
+# Registration and login hash passwords, so they are async views that run
+# that work on the bounded hashing pool instead of the shared sync thread.
+@method_decorator(csrf_exempt, name='dispatch')
+class UserRegistrationView(View):
+    http_method_names = ['post', 'options']
+
+    async def post(self, request):
+        try:
+            data = await request_data(request)
+        except APIException as e:
+            return JsonResponse({'detail': e.detail}, status=e.status_code)
+        body, status_code = await run_in_hashing_pool(self.register, data)
+        return JsonResponse(body, status=status_code)
+
+    def register(self, data):
+        serializer = UserRegistrationSerializer(data=data)
         if serializer.is_valid():
             user = serializer.save()
             token, created = Token.objects.get_or_create(user=user)
-            return Response({'token': token.key}, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            return {'token': token.key}, status.HTTP_201_CREATED
+        return serializer.errors, status.HTTP_400_BAD_REQUEST
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class UserLoginView(View):
+    http_method_names = ['post', 'options']
 
-class UserLoginView(APIView):
-    def post(self, request):
-        serializer = UserLoginSerializer(data=request.data)
+    async def post(self, request):
+        try:
+            data = await request_data(request)
+        except APIException as e:
+            return JsonResponse({'detail': e.detail}, status=e.status_code)
+        body, status_code = await run_in_hashing_pool(self.log_in, request, data)
+        return JsonResponse(body, status=status_code)
+
+    def log_in(self, request, data):
+        # authenticate() also rehashes the password if PASSWORD_HASHERS has a newer first choice
+        serializer = UserLoginSerializer(data=data)
         if serializer.is_valid():
             user = serializer.validated_data['user']
             login(request, user)
             token, created = Token.objects.get_or_create(user=user)
-            return Response({'token': token.key}, status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    
+            return {'token': token.key}, status.HTTP_200_OK
+        return serializer.errors, status.HTTP_400_BAD_REQUEST
+
 
 # Contact ViewSet
-class ContactViewSet(viewsets.ModelViewSet):
+class ContactViewSet(ConditionalGetMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Contact.objects.all()
     serializer_class = ContactSerializer
     
     @action(detail=False, methods=['get'], url_path='count')
+    @versioned
     def get_contact_count(self, request):
         count=Contact.objects.count()
         return Response({"total_contacts":count})
 
 
 # Animal (Patient) ViewSet
-class AnimalViewSet(viewsets.ModelViewSet):
+class AnimalViewSet(AsyncReadMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Animal.objects.all()
     serializer_class = AnimalSerializer
     
     @action(detail=False, methods=['get'], url_path='count')
-    def get_animal_count(self, request):
-        count=Animal.objects.count()
+    @versioned
+    async def get_animal_count(self, request):
+        count = await Animal.objects.acount()
         return Response({"total_patients":count})
 
 
 # Animal Diagnosis ViewSet
-class AnimalDiagnosisViewSet(viewsets.ModelViewSet):
+class AnimalDiagnosisViewSet(ConditionalGetMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = AnimalDiagnosis.objects.all()
     serializer_class = AnimalDiagnosisSerializer
+    version_models = (AnimalDiagnosis, Animal)  # ?expand=animal embeds the patient
 
 
 # Appointment ViewSet
-class AppointmentViewSet(viewsets.ModelViewSet):
+class AppointmentViewSet(AsyncReadMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Appointment.objects.all()
     serializer_class = AppointmentSerializer
-    
+
+    def perform_create(self, serializer):
+        # The unique (date, time) constraint settles races the validator cannot see
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            raise SlotConflict()
+
+    perform_update = perform_create
+
+    @action(detail=False, methods=['get'], url_path='availability')
+    def get_availability(self, request):
+        """Free appointment slots per day between ?from= and ?to= (defaults to the next 7 days)."""
+        query = AvailabilityQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        hours = clinic_hours()
+        return Response({
+            'slot_minutes': int(hours['slot'].total_seconds() // 60),
+            'days': free_slots(params['from'], params['to']),
+        })
+
     @action(detail=False, methods=['get'], url_path='count')
-    def get_appointment_count(self, request):
-        count=Appointment.objects.count()
+    @versioned
+    async def get_appointment_count(self, request):
+        count = await Appointment.objects.acount()
         return Response({"total_appointments":count})
 
 
-class MedicineViewSet(viewsets.ModelViewSet):
+EXPORT_CONTENT_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def export_response(queryset, fields, request, filename):
+    """
+    Stream a queryset as ?type=csv (default) or ?type=ndjson without buffering it.
+
+    Under ASGI the rows are produced by an async generator, the only kind
+    Django's ASGI handler streams rather than reading into memory first.
+    """
+    fmt = request.query_params.get('type', 'csv')
+    if fmt not in FORMATS:
+        return Response({"error": f"type must be one of: {', '.join(FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    stream = astream_rows if isinstance(request._request, ASGIRequest) else stream_rows
+    response = StreamingHttpResponse(stream(queryset, fields, fmt), content_type=EXPORT_CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
+
+
+class MedicineViewSet(AsyncReadMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Medicine.objects.all()
     serializer_class = MedicineSerializer
 
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            medicine = serializer.save()
+            reconcile_lots(medicine, previous_quantity=0)
+
+    def perform_update(self, serializer):
+        previous_quantity = serializer.instance.quantity
+        with transaction.atomic():
+            reconcile_lots(serializer.save(), previous_quantity)
+
+    @action(detail=True, methods=['post'], url_path='restock')
+    def restock_medicine(self, request, pk=None):
+        """Receive a new lot with its own expiry date instead of overwriting the medicine's."""
+        medicine = self.get_object()
+        serializer = MedicineLotSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lot = restock(medicine, **serializer.validated_data)
+        return Response(MedicineLotSerializer(lot).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], url_path='expiring')
+    def get_expiring_lots(self, request):
+        """Lots with stock left that expire within ?within=30d (or already have), soonest first."""
+        query = ExpiringQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        lots = (
+            MedicineLot.objects.filter(quantity__gt=0, expiry_date__lte=timezone.localdate() + params['within'])
+            .select_related('medicine')
+            .order_by('expiry_date', 'id')
+        )
+        context = self.get_serializer_context()
+        lots = MedicineLotSerializer(context=context).narrow_queryset(lots)[:params['limit']]
+        return Response(MedicineLotSerializer(lots, many=True, context=context).data)
+
     @action(detail=False, methods=['get'], url_path='count')
-    def get_medicine_count(self, request):
+    @versioned
+    async def get_medicine_count(self, request):
         """Count the total number of medicines."""
-        count = Medicine.objects.count()
+        count = await Medicine.objects.acount()
         return Response({"total_medicines": count})
 
     @action(detail=False, methods=['get'], url_path='low-stock')
     def get_low_stock_medicines(self, request):
-        """Retrieve medicines that have low stock (less than 5 units)."""
-        low_stock_medicines = Medicine.objects.filter(quantity__lt=5)
+        """Retrieve medicines that have low stock (less than LOW_STOCK_THRESHOLD units)."""
+        low_stock_medicines = Medicine.objects.filter(quantity__lt=LOW_STOCK_THRESHOLD)
         serializer = self.get_serializer(low_stock_medicines, many=True)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_medicines(self, request):
+        """Upsert medicines from an uploaded CSV/NDJSON `file`, reporting rejected rows."""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "Upload the catalog as a 'file' field"}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.data.get('type') or upload.name.rsplit('.', 1)[-1].lower()
+        if fmt not in FORMATS:
+            return Response({"error": f"type must be one of: {', '.join(FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        stream = TextIOWrapper(upload.file, encoding='utf-8', newline='')
+        try:
+            report = import_medicines(read_records(stream, fmt))
+        except UnicodeDecodeError as e:
+            return Response({"error": f"The file must be UTF-8 encoded ({e.reason})"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export_medicines(self, request):
+        fields = ('id', 'name', 'category', 'quantity', 'price', 'expiry_date')
+        return export_response(Medicine.objects.order_by('pk'), fields, request, 'medicines')
     
 
-class SaleViewSet(viewsets.ModelViewSet):
-    queryset = Sale.objects.all()
+class SaleViewSet(AsyncReadMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = Sale.objects.select_related('medicine')
     serializer_class = SaleSerializer
+    version_models = (Sale, Medicine)  # medicine_name is part of every sale
 
     def create(self, request, *args, **kwargs):
         """Custom sale logic - prevent selling more than available stock."""
-        medicine_id = request.data.get('medicine')
-        quantity_sold = int(request.data.get('quantity_sold', 0))
+        try:
+            return super().create(request, *args, **kwargs)
+        except InsufficientStock as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not medicine_id:
-            return Response({"error": "Medicine ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        extra = {'sale_date': data['sale_date']} if 'sale_date' in data else {}
+        serializer.instance = record_sale(data['medicine'], data['quantity_sold'], **extra)
 
-        medicine = get_object_or_404(Medicine, id=medicine_id)
+    @action(detail=False, methods=['post'], url_path='checkout')
+    def create_checkout(self, request):
+        """Sell several medicines at once; rejected as a whole if any line is short."""
+        serializer = CheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = [(item['medicine'], item['quantity_sold']) for item in serializer.validated_data['items']]
+        try:
+            sales = checkout(lines)
+        except Medicine.DoesNotExist as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except InsufficientStock as e:
+            return Response({"error": str(e), "items": e.shortages}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(SaleSerializer(sales, many=True).data, status=status.HTTP_201_CREATED)
 
-        if medicine.quantity < quantity_sold:
-            return Response({"error": "Not enough stock available"}, status=status.HTTP_400_BAD_REQUEST)
+    @action(detail=False, methods=['get'], url_path='export')
+    def export_sales(self, request):
+        fields = ('id', 'sale_date', 'medicine_id', 'medicine__name', 'quantity_sold', 'total_price')
+        return export_response(Sale.objects.order_by('pk'), fields, request, 'sales')
 
-        total_price = quantity_sold * medicine.price  # Ensure total_price is calculated
+    def perform_update(self, serializer):
+        # Keep the rollup adjustment in the same transaction as the edit
+        with transaction.atomic():
+            serializer.save()
 
-        request.data['total_price'] = total_price  # Inject total_price before saving
+    @action(detail=False, methods=['get'], url_path='timeseries')
+    def get_sales_timeseries(self, request):
+        """Revenue and units per day/week/month, answered from the daily rollups."""
+        query = SalesTimeseriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        rollups = DailySalesRollup.objects.filter(day__range=(params['from'], params['to']))
+        if 'medicine' in params:
+            rollups = rollups.filter(medicine_id=params['medicine'])
+        if 'category' in params:
+            rollups = rollups.filter(medicine__category=params['category'])
+
+        buckets = {'day': F('day'), 'week': TruncWeek('day'), 'month': TruncMonth('day')}
+        rollups = rollups.annotate(bucket=buckets[params['bucket']])
+        group = []
+        if params.get('group_by') == 'medicine':
+            group = ['medicine_id']
+        elif params.get('group_by') == 'category':
+            rollups = rollups.annotate(category=F('medicine__category'))
+            group = ['category']
+
+        series = (
+            rollups.values('bucket', *group)
+            .annotate(revenue=Sum('revenue'), units=Sum('units'), sales=Sum('sale_count'))
+            .order_by('bucket', *group)
+        )
+        return Response({
+            'bucket': params['bucket'],
+            'from': params['from'],
+            'to': params['to'],
+            'series': list(series),
+        })
 
-        try:
-            return super().create(request, *args, **kwargs)
-        except ValueError as e:
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        
     @action(detail=False, methods=['get'], url_path='count')
-    def get_sale_count(self, request):
-        count = Sale.objects.count()
+    @versioned
+    async def get_sale_count(self, request):
+        count = await Sale.objects.acount()
         return Response({"total_sales": count})
     
     @action(detail=False, methods=['get'], url_path='total-revenue')
-    def get_total_revenue(self, request):
-        """Calculate the total revenue of all sales."""
-        total_revenue = Sale.objects.aggregate(total_revenue=Sum('total_price'))['total_revenue'] or 0
-        return Response({"total_revenue": total_revenue})
+    @versioned
+    async def get_total_revenue(self, request):
+        """Total revenue of all sales, read from the maintained dashboard counter."""
+        counter = DashboardCounter.objects.filter(key=REVENUE_KEY).values_list('value', flat=True)
+        return Response({"total_revenue": await counter.afirst() or 0})
     
 #Custom user view
-class CustomUserViewSet(viewsets.ModelViewSet):
+class CustomUserViewSet(ConditionalGetMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
     
     @action(detail=False, methods=['get'], url_path='count')
+    @versioned
     def get_user_count(self, request):
         count=CustomUser.objects.count()
-        return Response({"total_users":count})
\ No newline at end of file
+        return Response({"total_users":count})
+
+
+# Dashboard summary view
+class DashboardSummaryView(APIView):
+    def get(self, request):
+        """Return every dashboard total in one response, read from the maintained counters."""
+        counters = DashboardCounter.objects.snapshot()
+        summary = {key: int(counters.get(key, 0)) for key in COUNTED_MODELS.values()}
+        summary[REVENUE_KEY] = counters.get(REVENUE_KEY, 0)
+        return Response(summary)
+
+
+# Response cache effectiveness for this worker
+class ResponseCacheStatsView(APIView):
+    def get(self, request):
+        return Response(response_cache_stats.snapshot())
+
+
+# Prometheus scrape target for this worker
+def metrics(request):
+    return HttpResponse(request_metrics.exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# Full-text search over patients and diagnoses
+class SearchView(APIView):
+    serializers_by_kind = {'patient': AnimalSerializer, 'diagnosis': AnimalDiagnosisSerializer}
+
+    def get(self, request):
+        """Ranked patient/owner and diagnosis matches for ?q=, paged with ?limit=&offset=."""
+        query = SearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        kinds = (params['type'],) if 'type' in params else KINDS
+
+        matches = search(params['q'], kinds, limit=params['limit'], offset=params['offset'])
+        next_url = None
+        if len(matches) == params['limit']:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), 'offset', params['offset'] + params['limit']
+            )
+        return Response({
+            'next': next_url,
+            'results': [
+                {'type': kind, 'score': round(score, 4), kind: self.serializers_by_kind[kind](obj).data}
+                for kind, obj, score in matches
+            ],
+        })
+
+
+# Server-sent events for live dashboards
+async def event_stream(request):
+    """
+    Push sale, low-stock, appointment and patient events as text/event-stream.
+
+    A comment line is sent every EVENT_STREAM_HEARTBEAT seconds so proxies keep
+    an idle connection open.
+    """
+    heartbeat = getattr(settings, 'EVENT_STREAM_HEARTBEAT', 15)
+
+    async def stream():
+        events = get_broker().subscribe()
+        pending = None
+        try:
+            yield ': connected\n\n'
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(events.__anext__())
+                done, _ = await asyncio.wait({pending}, timeout=heartbeat)
+                if not done:
+                    yield ': keep-alive\n\n'
+                    continue
+                event, pending = pending.result(), None
+                yield format_sse(event)
+        finally:
+            if pending is not None:
+                pending.cancel()
+            await events.aclose()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response